@@ -0,0 +1,114 @@
+# import external packages
+import numpy as np
+import pandas as pd
+from schema import compact, allow_value
+
+# attributes of an actor, the same for all of the actor's movies
+ACTOR_COLUMNS = ["actor_rating", "actor_category"]
+DEFAULTS = {"actor_rating": 0, "actor_category": np.nan}
+
+
+def _empty():
+    df = pd.DataFrame({col: pd.Series(dtype=object) for col in ACTOR_COLUMNS})
+    df.index.name = "actor"
+    return compact(df)
+
+
+class ActorTable:
+    """Actor attributes, one row per actor, indexed by actor name.
+
+    The workbook and the movies table keep actor_rating on every movie
+    row. split() takes it out after loading and join() puts it back for
+    persisting and exporting, so reading or changing an actor's rating
+    is a single lookup instead of a pass over all movies. Actors missing
+    from the table have the DEFAULTS.
+    """
+
+    def __init__(self, df=None):
+        self.df = _empty() if df is None else compact(df)
+
+    @classmethod
+    def split(cls, movies, stored=None):
+        """Take the actor columns out of a movie frame.
+
+        Returns the movie frame without them and the actor table. The
+        ratings on the movie rows win over the stored table, they may
+        have been edited in the workbook. Other attributes and actors
+        without movies come from stored.
+        """
+        table = _empty() if stored is None else stored.copy()
+        present = [col for col in ACTOR_COLUMNS if col in movies.columns]
+        if len(present) > 0:
+            # first value per actor, missing values are skipped
+            values = movies.groupby("actor", observed=True, sort=False)[present].first()
+            values.index = values.index.astype(object)
+            new = values.index.difference(table.index)
+            table = pd.concat([table, pd.DataFrame(index=new, columns=ACTOR_COLUMNS)])
+            for col in present:
+                known = values[col].dropna()
+                table[col] = table[col].astype(object)
+                table.loc[known.index, col] = known.to_numpy()
+            movies = movies.drop(columns=present)
+        table.index.name = "actor"
+        table["actor_rating"] = table["actor_rating"].fillna(0)
+        return movies, cls(table)
+
+    def add(self, actors):
+        """Add rows with the defaults for actors not in the table yet"""
+        new = pd.Index(pd.unique(np.asarray(actors, dtype=object))).difference(
+            self.df.index
+        )
+        new = new[new.notna()]
+        if len(new) == 0:
+            return
+        rows = pd.DataFrame({col: DEFAULTS[col] for col in ACTOR_COLUMNS}, index=new)
+        self.df = compact(pd.concat([self.df, rows]))
+        self.df.index.name = "actor"
+
+    def get(self, actor, col):
+        try:
+            value = self.df.at[actor, col]
+        except KeyError:
+            return DEFAULTS[col]
+        return DEFAULTS[col] if pd.isna(value) else value
+
+    def set(self, actor, col, value):
+        if actor not in self.df.index:
+            self.add([actor])
+        allow_value(self.df, col, value)
+        self.df.at[actor, col] = value
+
+    def where(self, col, predicate):
+        """Actors whose attribute col satisfies predicate (vectorised)"""
+        mask = np.asarray(predicate(self.df[col].to_numpy()), dtype=bool)
+        return self.df.index[mask].tolist()
+
+    def per_row(self, movies, col, positions=None):
+        """Attribute col of the actor of every movie row (or of positions)"""
+        s = movies["actor"]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # one lookup per distinct actor, then by category code
+            lut = self.df[col].reindex(s.cat.categories.astype(object))
+            codes = s.cat.codes.to_numpy()
+            if positions is not None:
+                codes = codes[positions]
+            lut = (
+                lut.to_numpy(dtype=object) if col != "actor_rating" else lut.to_numpy()
+            )
+            # code -1 (no actor) picks the default at the end
+            values = np.append(lut, DEFAULTS[col])[codes]
+        else:
+            if positions is not None:
+                s = s.iloc[positions]
+            values = self.df[col].reindex(s.to_numpy()).to_numpy()
+        if col == "actor_rating":
+            values = np.nan_to_num(values.astype(float)).astype(self.df[col].dtype)
+        return values
+
+    def join(self, movies, columns):
+        """Copy of a movie frame with the actor columns, in column order"""
+        out = movies.copy()
+        for col in ACTOR_COLUMNS:
+            if col in columns:
+                out[col] = self.per_row(movies, col)
+        return out[columns]
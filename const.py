@@ -28,4 +28,5 @@ import os
 CURDIR = os.path.dirname(sys.argv[0])
 TMPDIR = os.path.join(CURDIR, "tmp")
 EXTLIST = [".m4v", ".f4v", ".mp4", ".MP4", ".mkv", ".avi", ".wmv", ".flv", ".mov", ".mpg", ".mpeg", ".264"]
-MINRATING = 4
\ No newline at end of file
+MINRATING = 4
+WATCH_MAX_REMOVE = 0.5  # share of the library the watch may remove without asking
\ No newline at end of file
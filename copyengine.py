@@ -0,0 +1,155 @@
+# import standard packages
+import os
+import errno
+
+CHUNK_SIZE = 16 * 1024 * 1024  # bytes per copy_file_range/sendfile call
+BUFFER_SIZE = 8 * 1024 * 1024  # buffer of the read/write fallback
+
+# errors meaning "this call is not supported here", try the next method
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+}
+
+_fallocate = None
+
+
+def _load_fallocate():
+    # fallocate(2) instead of os.posix_fallocate: glibc emulates the latter
+    # by writing zeros on filesystems without support (vfat, exfat), which
+    # would write every byte twice
+    global _fallocate
+    if _fallocate is None:
+        _fallocate = False
+        try:
+            import ctypes
+            import ctypes.util
+
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            func = libc.fallocate
+            func.argtypes = [
+                ctypes.c_int,
+                ctypes.c_int,
+                ctypes.c_longlong,
+                ctypes.c_longlong,
+            ]
+            _fallocate = func
+        except (OSError, AttributeError, TypeError):
+            pass
+    return _fallocate
+
+
+def preallocate(fd, size):
+    """Reserve size bytes for fd up front, best effort"""
+    if size <= 0:
+        return False
+    func = _load_fallocate()
+    if not func:
+        return False
+    if func(fd, 0, 0, size) == 0:
+        return True
+    import ctypes
+
+    err = ctypes.get_errno()
+    if err == errno.ENOSPC:
+        # fail before copying anything
+        raise OSError(err, os.strerror(err))
+    return False
+
+
+def advise_sequential(fd):
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def _copy_file_range(in_fd, out_fd, offset, size, progress):
+    while offset < size:
+        sent = os.copy_file_range(in_fd, out_fd, min(CHUNK_SIZE, size - offset))
+        if sent == 0:
+            break
+        offset += sent
+        progress(sent)
+    return offset
+
+
+def _sendfile(in_fd, out_fd, offset, size, progress):
+    while offset < size:
+        sent = os.sendfile(out_fd, in_fd, offset, min(CHUNK_SIZE, size - offset))
+        if sent == 0:
+            break
+        offset += sent
+        progress(sent)
+    return offset
+
+
+def _read_write(in_fd, out_fd, offset, size, progress):
+    # copies to the end of the source, also when it grew meanwhile
+    os.lseek(in_fd, offset, os.SEEK_SET)
+    os.lseek(out_fd, offset, os.SEEK_SET)
+    while True:
+        chunk = os.read(in_fd, BUFFER_SIZE)
+        if len(chunk) == 0:
+            break
+        view = memoryview(chunk)
+        written = 0
+        while written < len(chunk):
+            written += os.write(out_fd, view[written:])
+        offset += len(chunk)
+        progress(len(chunk))
+    return offset
+
+
+def _no_progress(n):
+    pass
+
+
+def copy_file(src, dest, progress=None):
+    """Copy src to dest inside this process, returns the bytes copied.
+
+    Tries copy_file_range (which also clones extents on btrfs/xfs), then
+    sendfile, then plain reads and writes with a large buffer. The
+    destination is preallocated and the source read with a sequential
+    access hint. progress(n) is called after every chunk of n bytes.
+    dest is fsynced before returning, so it can be renamed into place.
+    """
+    if progress is None:
+        progress = _no_progress
+    methods = []
+    if hasattr(os, "copy_file_range"):
+        methods.append(_copy_file_range)
+    if hasattr(os, "sendfile"):
+        methods.append(_sendfile)
+    methods.append(_read_write)
+
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        in_fd = fsrc.fileno()
+        out_fd = fdst.fileno()
+        size = os.fstat(in_fd).st_size
+        advise_sequential(in_fd)
+        preallocated = preallocate(out_fd, size)
+
+        copied = 0
+        for method in methods:
+            try:
+                copied = method(in_fd, out_fd, copied, size, progress)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                # every method writes at the destination's file position,
+                # carry on from there with the next one
+                copied = os.lseek(out_fd, 0, os.SEEK_CUR)
+                continue
+            if copied >= size:
+                break
+
+        if preallocated and copied != size:
+            # the source changed size while copying
+            os.ftruncate(out_fd, copied)
+        os.fsync(out_fd)
+    return copied
@@ -0,0 +1,110 @@
+# import standard packages
+import os
+import json
+import time
+import threading
+from utils import drop_torn_line
+
+JOB_FILENAME = ".lockerplayer_job.json"
+DONE_FILENAME = ".lockerplayer_job.done"
+PART_SUFFIX = ".part"
+
+
+def part_path(dest):
+    """Temporary name a file is copied to before it is renamed into place"""
+    return dest + PART_SUFFIX
+
+
+class CopyJob:
+    """Checkpoint manifest of a copy run, kept at the destination.
+
+    The plan (kind, planned files and their sizes) is written once to
+    JOB_FILENAME. Every finished file is appended to DONE_FILENAME with a
+    single fsynced line, so marking progress stays cheap for big jobs.
+    Files are copied to part_path(dest) and renamed when complete, a file
+    under its final name is therefore never truncated.
+    """
+
+    def __init__(self, destroot, kind, items, done=None, created=None):
+        self.destroot = destroot
+        self.kind = kind
+        self.items = [(rel_path, int(size)) for rel_path, size in items]
+        self.done = set() if done is None else set(done)
+        self.created = time.time() if created is None else created
+        self.lock = threading.Lock()
+        self.done_f = None
+
+    @property
+    def job_path(self):
+        return os.path.join(self.destroot, JOB_FILENAME)
+
+    @property
+    def done_path(self):
+        return os.path.join(self.destroot, DONE_FILENAME)
+
+    @classmethod
+    def load(cls, destroot):
+        """Job left behind by an earlier run, or None"""
+        path = os.path.join(destroot, JOB_FILENAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+        done = set()
+        done_path = os.path.join(destroot, DONE_FILENAME)
+        if os.path.exists(done_path):
+            with open(done_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        done.add(json.loads(line))
+                    except ValueError:
+                        # torn last line after a crash
+                        break
+        return cls(destroot, plan["kind"], plan["items"], done, plan["created"])
+
+    def save(self):
+        """Write the plan and start an empty completion log"""
+        plan = {"kind": self.kind, "created": self.created, "items": self.items}
+        tmp_path = self.job_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(plan, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.job_path)
+        with open(self.done_path, "w", encoding="utf-8"):
+            pass
+
+    def pending(self):
+        """Planned (rel_path, size) items which are not finished yet"""
+        return [item for item in self.items if item[0] not in self.done]
+
+    def total_size(self):
+        return sum(size for _, size in self.items)
+
+    def mark_done(self, rel_path):
+        with self.lock:
+            if self.done_f is None:
+                # a torn line of a crashed run would hide the lines after it
+                drop_torn_line(self.done_path)
+                self.done_f = open(self.done_path, "a", encoding="utf-8")
+            self.done_f.write(json.dumps(rel_path) + "\n")
+            self.done_f.flush()
+            os.fsync(self.done_f.fileno())
+            self.done.add(rel_path)
+
+    def close(self):
+        with self.lock:
+            if self.done_f is not None:
+                self.done_f.close()
+                self.done_f = None
+
+    def finish(self):
+        """Remove the manifest and left over partial files"""
+        self.close()
+        for rel_path, _ in self.items:
+            path = part_path(os.path.join(self.destroot, *rel_path.split("\\")))
+            if os.path.exists(path):
+                os.remove(path)
+        for path in [self.done_path, self.job_path]:
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,158 @@
+# import standard packages
+import os
+import time
+import threading
+from collections import deque
+
+
+def device_of(path):
+    """Device number of the filesystem holding path"""
+    return os.stat(path).st_dev
+
+
+def is_rotational(dev):
+    """True for a spinning disk, False for flash, None when unknown (non Linux)"""
+    if not hasattr(os, "major"):
+        return None
+    base = f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"
+    # a partition has no queue of its own, its disk is the parent folder
+    for path in [
+        os.path.join(base, "queue", "rotational"),
+        os.path.join(base, "..", "queue", "rotational"),
+    ]:
+        try:
+            with open(path, "r") as f:
+                return f.read().strip() == "1"
+        except OSError:
+            continue
+    return None
+
+
+def device_name(dev):
+    kind = {True: "HDD", False: "SSD", None: "unknown"}[is_rotational(dev)]
+    if not hasattr(os, "major"):
+        return f"{dev} ({kind})"
+    return f"{os.major(dev)}:{os.minor(dev)} ({kind})"
+
+
+class DeviceGroup:
+    """Copies between one source device and one destination device.
+
+    The number of copies in flight is tuned by hill climbing on the
+    measured throughput: every `interval` seconds the limit moves one step
+    in the current direction, and turns around when MB/s dropped.
+    """
+
+    def __init__(self, src_dev, dest_dev, max_limit, interval):
+        self.src_dev = src_dev
+        self.dest_dev = dest_dev
+        self.max_limit = max_limit
+        self.interval = interval
+        self.queue = deque()
+        self.inflight = 0
+        self.lock = threading.Lock()
+        self.bytes = 0  # bytes copied in the current window
+        self.total_bytes = 0
+        self.window_start = time.monotonic()
+        self.last_rate = None
+        self.best_rate = 0.0
+        self.direction = 1
+        rotational = is_rotational(src_dev) or is_rotational(dest_dev)
+        # a spinning disk starts with a single reader, the rest with two
+        self.limit = 1 if rotational else min(2, max_limit)
+        self.peak_limit = self.limit
+
+    def add_bytes(self, n):
+        with self.lock:
+            self.bytes += n
+            self.total_bytes += n
+
+    def tune(self, now):
+        """Adjust the limit once a measurement window is over"""
+        elapsed = now - self.window_start
+        if elapsed < self.interval:
+            return
+        with self.lock:
+            copied, self.bytes = self.bytes, 0
+        self.window_start = now
+        if self.inflight == 0 or (len(self.queue) == 0 and self.inflight < self.limit):
+            # draining, the measurement says nothing about the limit
+            return
+
+        rate = copied / elapsed
+        self.best_rate = max(self.best_rate, rate)
+        if self.last_rate is not None and rate < self.last_rate * 0.95:
+            self.direction = -self.direction
+        self.last_rate = rate
+        self.limit = max(1, min(self.max_limit, self.limit + self.direction))
+        if self.limit in (1, self.max_limit):
+            # bounce off the bounds instead of sticking to them
+            self.direction = 1 if self.limit == 1 else -1
+        self.peak_limit = max(self.peak_limit, self.limit)
+
+    def describe(self):
+        return (
+            f"{device_name(self.src_dev)} -> {device_name(self.dest_dev)}: "
+            f"{self.limit} parallel copies (peak {self.peak_limit}), "
+            f"best {self.best_rate / 1024 / 1024:.1f} MB/s"
+        )
+
+
+class AdaptiveCopyScheduler:
+    """Runs copy tasks with a per-device number of copies in flight.
+
+    Tasks are grouped by (source device, destination device). Each group
+    tunes its own concurrency between 1 and max_workers, max_workers also
+    caps the copies running in total. copy_func(*args, progress=callback)
+    must report copied bytes through the callback.
+    """
+
+    def __init__(self, copy_func, max_workers, interval=5.0):
+        self.copy_func = copy_func
+        self.max_workers = max(1, max_workers)
+        self.interval = interval
+        self.groups = {}
+
+    def add(self, src_dev, dest_dev, *args):
+        key = (src_dev, dest_dev)
+        group = self.groups.get(key)
+        if group is None:
+            group = DeviceGroup(src_dev, dest_dev, self.max_workers, self.interval)
+            self.groups[key] = group
+        group.queue.append(args)
+
+    def run(self):
+        """Yield (args, future) for every task as it completes"""
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+        futures = {}  # future -> (group, args)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                for group in self.groups.values():
+                    while (
+                        len(group.queue) > 0
+                        and group.inflight < group.limit
+                        and len(futures) < self.max_workers
+                    ):
+                        args = group.queue.popleft()
+                        future = executor.submit(
+                            self.copy_func, *args, progress=group.add_bytes
+                        )
+                        futures[future] = (group, args)
+                        group.inflight += 1
+                if len(futures) == 0:
+                    return
+
+                done, _ = wait(
+                    list(futures),
+                    timeout=self.interval,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    group, args = futures.pop(future)
+                    group.inflight -= 1
+                    yield args, future
+
+                now = time.monotonic()
+                for group in self.groups.values():
+                    group.tune(now)
@@ -0,0 +1,136 @@
+# import standard packages
+import os
+import pickle
+import hashlib
+import threading
+from verify import file_digest
+
+SAMPLE_SIZE = 64 * 1024  # bytes read at head, middle and tail
+
+
+def sample_fingerprint(path, size):
+    """blake2b over the size and three sampled chunks of a file"""
+    h = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        for offset in sorted(
+            {0, max(0, size // 2 - SAMPLE_SIZE // 2), max(0, size - SAMPLE_SIZE)}
+        ):
+            f.seek(offset)
+            h.update(f.read(SAMPLE_SIZE))
+    return h.hexdigest()
+
+
+def _index_key(entry):
+    # files without an inode number (some filesystems) are keyed by path
+    inode = entry.inode if entry.inode else entry.rel_path
+    return inode, entry.size, entry.mtime
+
+
+class FingerprintIndex:
+    """Persistent cache of sampled and full fingerprints.
+
+    Keyed by (inode, size, mtime), so a file which was renamed or moved to
+    another actor keeps its fingerprints and a changed file is hashed
+    again. save() keeps only the keys used by the last search.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}  # key -> {"sample": digest, "full": digest}
+        self.used = set()
+        self.dirty = False
+        try:
+            with open(path, "rb") as f:
+                self.entries = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not read fingerprint index, starting over: {e}")
+
+    def get(self, key, kind):
+        with self.lock:
+            self.used.add(key)
+            return self.entries.get(key, {}).get(kind)
+
+    def set(self, key, kind, value):
+        with self.lock:
+            self.entries.setdefault(key, {})[kind] = value
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            stale = set(self.entries) - self.used
+            if not self.dirty and len(stale) == 0:
+                return
+            for key in stale:
+                del self.entries[key]
+            tmp = self.path + ".tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    pickle.dump(self.entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self.path)
+                self.dirty = False
+            except Exception as e:
+                print(f"Warning: Could not write fingerprint index: {e}")
+
+
+def _fingerprints(entries, index, kind, max_workers):
+    # fingerprint of every entry, from the index or computed on the pool
+    from concurrent.futures import ThreadPoolExecutor
+
+    def fingerprint(entry):
+        key = _index_key(entry)
+        value = index.get(key, kind)
+        if value is None:
+            try:
+                if kind == "sample":
+                    value = sample_fingerprint(entry.path, entry.size)
+                else:
+                    value = file_digest(entry.path)
+            except OSError:
+                return None
+            index.set(key, kind, value)
+        return value
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fingerprint, entries))
+
+
+def _regroup(groups, index, kind, max_workers):
+    # split every group by fingerprint, keep the parts which still collide
+    entries = [entry for group in groups for entry in group]
+    values = _fingerprints(entries, index, kind, max_workers)
+    split = {}
+    for entry, value in zip(entries, values):
+        if value is not None:
+            split.setdefault((entry.size, value), []).append(entry)
+    return [group for group in split.values() if len(group) > 1]
+
+
+def find_duplicates(entries, index, max_workers=4):
+    """Groups of files with identical content, largest files first.
+
+    Works in stages so that only real candidates are read in full: files
+    are grouped by size, groups are split by sampled fingerprints (head,
+    middle and tail) and what still collides by a full blake2b.
+    Hard links to the same inode are not duplicates and count once.
+    """
+    by_size = {}
+    seen_inodes = set()
+    for entry in entries:
+        if not entry.size:
+            continue
+        if entry.inode:
+            if entry.inode in seen_inodes:
+                continue
+            seen_inodes.add(entry.inode)
+        by_size.setdefault(entry.size, []).append(entry)
+    groups = [group for group in by_size.values() if len(group) > 1]
+
+    groups = _regroup(groups, index, "sample", max_workers)
+    groups = _regroup(groups, index, "full", max_workers)
+    for group in groups:
+        group.sort(key=lambda entry: entry.rel_path)
+    groups.sort(key=lambda group: (-group[0].size, group[0].rel_path))
+    return groups
@@ -0,0 +1,98 @@
+# import standard packages
+import time
+import sqlite3
+import threading
+
+DAY = 24 * 60 * 60
+
+
+class EventLog:
+    """Append-only log of plays, ratings and deletions in its own SQLite file.
+
+    Kept apart from the movies table so that history never makes the
+    database writes or the workbook export bigger. Indexes per movie, per
+    actor and by time answer "last played", "plays in the last days" and
+    the history view without scanning the log.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY, ts REAL NOT NULL, kind TEXT NOT NULL, "
+            "rel_path TEXT, actor TEXT, value INTEGER)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS events_movie ON events (rel_path, kind, ts)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS events_actor ON events (actor, kind, ts)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS events_ts ON events (ts)")
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def append(self, kind, rel_path=None, actor=None, value=None, ts=None):
+        """Record one event: "play", "movie_rating", "actor_rating" or "delete" """
+        ts = time.time() if ts is None else ts
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO events (ts, kind, rel_path, actor, value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (ts, kind, rel_path, actor, value),
+            )
+            self.conn.commit()
+
+    def _where(self, rel_path, actor):
+        # plays of a movie, of an actor, or all plays
+        if rel_path is not None:
+            return "rel_path = ? AND kind = 'play'", [rel_path]
+        if actor is not None:
+            return "actor = ? AND kind = 'play'", [actor]
+        return "kind = 'play'", []
+
+    def last_played(self, rel_path=None, actor=None):
+        """Time of the last play of a movie or an actor, None if never"""
+        where, params = self._where(rel_path, actor)
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT MAX(ts) FROM events WHERE {where}", params
+            ).fetchone()
+        return row[0]
+
+    def plays_since(self, days, rel_path=None, actor=None):
+        """Number of plays of a movie, an actor or of all in the last days"""
+        where, params = self._where(rel_path, actor)
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT COUNT(*) FROM events WHERE {where} AND ts >= ?",
+                params + [time.time() - days * DAY],
+            ).fetchone()
+        return row[0]
+
+    def last_played_all(self):
+        """rel_path -> time of the last play, for every movie ever played"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT rel_path, MAX(ts) FROM events WHERE kind = 'play' "
+                "GROUP BY rel_path"
+            ).fetchall()
+        return dict(rows)
+
+    def history(self, limit=20, kinds=None):
+        """Newest events first, as (ts, kind, rel_path, actor, value)"""
+        query = "SELECT ts, kind, rel_path, actor, value FROM events"
+        params = []
+        if kinds is not None:
+            query += f" WHERE kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        query += " ORDER BY ts DESC LIMIT ?"
+        with self.lock:
+            return self.conn.execute(query, params + [limit]).fetchall()
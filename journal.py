@@ -0,0 +1,130 @@
+# import standard packages
+import os
+import json
+import threading
+from itertools import groupby
+import pandas as pd
+from schema import allow_value
+from utils import drop_torn_line
+
+
+def _json_default(value):
+    # numpy scalars coming out of the frame
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Cannot journal value of type {type(value)}")
+
+
+class Journal:
+    """Append-only write-ahead journal of changes made to df_lockerdb.
+
+    Every record is one JSON line, flushed and fsynced on append. The
+    journal is replayed over the last store snapshot on startup, and
+    compaction folds it into the store: rotate() moves the live journal
+    aside, the caller persists the frame, then discard_rotated() drops it.
+    Rotations are numbered so that a write which finishes after a newer
+    rotation does not drop records it did not persist.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rotated_path = path + ".old"
+        self.lock = threading.Lock()
+        self.count = 0  # records appended since the last rotation
+        self.rotations = 0
+        # records appended behind a torn line would be lost with it
+        for path in [self.rotated_path, self.path]:
+            drop_torn_line(path)
+        self.f = open(self.path, "a", encoding="utf-8")
+
+    def append(self, *records):
+        """Append records with a single fsync"""
+        lines = [json.dumps(record, default=_json_default) + "\n" for record in records]
+        with self.lock:
+            self.f.write("".join(lines))
+            self.f.flush()
+            os.fsync(self.f.fileno())
+            self.count += len(records)
+
+    def records(self):
+        """All pending records, oldest first, including a rotated journal"""
+        records = []
+        for path in [self.rotated_path, self.path]:
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # torn last line after a crash
+                        break
+        return records
+
+    def rotate(self):
+        with self.lock:
+            self.f.close()
+            if os.path.exists(self.rotated_path):
+                # an earlier compaction did not finish, keep both parts
+                with open(self.path, "r", encoding="utf-8") as src:
+                    with open(self.rotated_path, "a", encoding="utf-8") as dst:
+                        dst.write(src.read())
+                os.remove(self.path)
+            elif os.path.exists(self.path):
+                os.replace(self.path, self.rotated_path)
+            self.f = open(self.path, "a", encoding="utf-8")
+            self.count = 0
+            self.rotations += 1
+            return self.rotations
+
+    def discard_rotated(self, rotation=None):
+        with self.lock:
+            if rotation is not None and rotation != self.rotations:
+                # a newer rotation is waiting for its own write
+                return
+            if os.path.exists(self.rotated_path):
+                os.remove(self.rotated_path)
+
+    def close(self):
+        with self.lock:
+            self.f.close()
+
+
+def replay(df, records):
+    """Apply journal records over a frame, returns the updated frame.
+
+    Runs of add or del records (a refresh journals thousands at once) are
+    applied with one concat or drop each.
+    """
+    for op, group in groupby(records, key=lambda record: record["op"]):
+        group = list(group)
+        if op == "add":
+            rows = {}
+            for record in group:
+                if record["rel_path"] not in df.index:
+                    rows.setdefault(record["rel_path"], record["row"])
+            if len(rows) > 0:
+                df = pd.concat(
+                    [df, pd.DataFrame(list(rows.values()), index=list(rows))]
+                )
+        elif op == "del":
+            rel_paths = dict.fromkeys(record["rel_path"] for record in group)
+            df = df.drop([p for p in rel_paths if p in df.index])
+        else:
+            for record in group:
+                _apply(df, record)
+    df.index.name = "rel_path"
+    return df
+
+
+def _apply(df, record):
+    # set and set_actor change the frame in place
+    op = record["op"]
+    if op == "set":
+        if record["rel_path"] in df.index:
+            allow_value(df, record["col"], record["value"])
+            df.at[record["rel_path"], record["col"]] = record["value"]
+    elif op == "set_actor":
+        select = df["actor"] == record["actor"]
+        allow_value(df, record["col"], record["value"])
+        df.loc[select, record["col"]] = record["value"]
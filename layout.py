@@ -0,0 +1,82 @@
+# import standard packages
+import os
+import struct
+
+FS_IOC_FIEMAP = 0xC020660B
+FIEMAP_MAX_OFFSET = 0xFFFFFFFFFFFFFFFF
+FIEMAP_HEADER = struct.Struct("QQIIII")  # start, length, flags, mapped, count, reserved
+FIEMAP_EXTENT = struct.Struct("QQQQQIIII")  # logical, physical, length, ...
+
+# sort tiers, files of a better tier come first
+TIER_PHYSICAL = 0
+TIER_INODE = 1
+TIER_PATH = 2
+
+
+def first_extent(path):
+    """Physical byte offset of the first extent of a file, None when unknown.
+
+    Uses the FIEMAP ioctl, which exists on Linux for most local
+    filesystems (ext4, xfs, btrfs). Files without data (fully sparse) have
+    no extent.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    buf = bytearray(FIEMAP_HEADER.size + FIEMAP_EXTENT.size)
+    FIEMAP_HEADER.pack_into(buf, 0, 0, FIEMAP_MAX_OFFSET, 0, 0, 1, 0)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        fcntl.ioctl(fd, FS_IOC_FIEMAP, buf)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    mapped = FIEMAP_HEADER.unpack_from(buf, 0)[3]
+    if mapped == 0:
+        return None
+    return FIEMAP_EXTENT.unpack_from(buf, FIEMAP_HEADER.size)[1]
+
+
+def layout_key(path):
+    """Sort key which follows the position of a file on its disk"""
+    physical = first_extent(path)
+    if physical is not None:
+        return TIER_PHYSICAL, physical, path
+    try:
+        inode = os.stat(path).st_ino
+    except OSError:
+        inode = 0
+    if inode != 0:
+        # inodes are allocated close to the data on ext4 and friends
+        return TIER_INODE, inode, path
+    return TIER_PATH, 0, path
+
+
+def layout_order(items, path_func):
+    """Sort items by the physical location of path_func(item) on disk.
+
+    Falls back to inode numbers where FIEMAP is not supported and to
+    directory order (the path) where there are no inodes either.
+    """
+    decorated = [(layout_key(path_func(item)), i) for i, item in enumerate(items)]
+    decorated.sort()
+    return [items[i] for _, i in decorated]
+
+
+def seek_distance(paths):
+    """Bytes the head travels between the first extents of paths, in order"""
+    distance = 0
+    last = None
+    for path in paths:
+        physical = first_extent(path)
+        if physical is None:
+            continue
+        if last is not None:
+            distance += abs(physical - last)
+        last = physical
+    return distance
@@ -1,22 +1,44 @@
 # import standard packages
+# modules needed by only a few menu entries (tqdm, send2trash, subprocess,
+# concurrent.futures) are imported inside the functions using them
+import time
+
+startup_timer_start = time.perf_counter()
+
 import shutil
 import pandas as pd
+import numpy as np
 import os.path
 import random
-from datetime import datetime
-import time
-from send2trash import send2trash
 import configparser
-import subprocess
-from tqdm import tqdm
-import stat
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # import custom packages
 from utils import *
 from menu import *
 from const import *
+from store import LockerStore, file_stamp
+from journal import Journal, replay
+from writer import PersistenceWriter
+from snapshot import snapshot_key, load_snapshot, save_snapshot
+from scanner import split_db_path, diff_paths, scan, load_manifest, save_manifest
+from scanner import missing_mask, stat_paths
+from watcher import Watcher
+from minicsv import MiniCsvWriter, drop_rows
+from copyjob import CopyJob, part_path
+from copyengine import copy_file
+from copysched import AdaptiveCopyScheduler, device_of
+from layout import layout_order
+from planner import plan_fill, weighted_order, copy_weights, WEIGHT_MODES
+from verify import DigestLog, verify_copy, verify_file
+from dupes import FingerprintIndex, find_duplicates
+from mirror import plan_mirror, describe_plan
+from selection import SelectionIndex
+from schema import compact, allow_value, export_frame, memory_report
+from sampler import Sampler, parse_weights
+from events import EventLog
+from actors import ActorTable
+import atexit
 import platform
 
 # globals
@@ -24,10 +46,51 @@ config = configparser.ConfigParser()
 configfile = os.path.join(os.path.dirname(__file__), "config.ini")
 config.read(configfile)
 df_lockerdb = pd.DataFrame()
+actors = ActorTable()  # rating and category per actor, split off df_lockerdb
+db_columns = []  # column order of the workbook and the movies table
+store = None
+journal = None
+writer = None
+watcher = None
+events = None  # play history, kept apart from the database
+db_lock = threading.RLock()  # serialises changes from the watch thread
+selection = SelectionIndex()  # row positions per actor, studio, rating, ...
+sampler = Sampler()  # weighted no-repeat picks of the play menus
+startup_timer = StageTimer(startup_timer_start)
+startup_timer.mark("import")
+
+
+def store_path():
+    # local database file, kept out of the (cloud synced) workbook folder
+    default = os.path.join(os.path.dirname(__file__), "LockerDB.db")
+    return config["DEFAULT"].get("DBFILE", default)
+
+
+def state_path(ext):
+    # side files of the store (journal, caches) live next to it
+    return os.path.splitext(store_path())[0] + ext
+
+
+def pick_weights():
+    # exponents of the pick weight factors, e.g. "movie_rating=1, playcount=1"
+    text = config["DEFAULT"].get("PICK_WEIGHTS", "")
+    try:
+        return parse_weights(text)
+    except ValueError as e:
+        print(f"Warning: Invalid PICK_WEIGHTS ({e}), picking unweighted")
+        return parse_weights("")
+
+
+def treat_data_types(df):
+    df.playcount = pd.to_numeric(df.playcount)
+    df.movie_rating = pd.to_numeric(df.movie_rating)
+    df.actor_rating = pd.to_numeric(df.actor_rating)
+    df.studio = df.studio.astype(str)
+    compact(df)
 
 
 def gsheet_init():
-    global df_lockerdb
+    global df_lockerdb, store, journal, writer, events, actors, db_columns
     myprint("Loading database")
 
     # read db from google sheet
@@ -39,32 +102,100 @@ def gsheet_init():
     # ws = sheet.get_worksheet(0)
     # df_lockerdb = pd.DataFrame(ws.get_all_records())
 
-    # read db from excel
-    df_lockerdb = pd.read_excel(config["DEFAULT"]["EXCEL"])
+    store = LockerStore(store_path())
+    sampler.exponents = pick_weights()
+    sampler.recency_days = float(config["DEFAULT"].get("RECENCY_DAYS", "30"))
+    events = EventLog(state_path(".events"))
+    if sampler.exponents["recency"] != 0:
+        sampler.last_played = events.last_played_all()
+    excel = config["DEFAULT"]["EXCEL"]
+
+    # import the workbook when the local store is new, or when the workbook
+    # was changed outside of this program since we last exported it
+    excel_changed = os.path.exists(excel) and (
+        store.get_meta("excel_stamp") != file_stamp(excel)
+    )
+    if store.is_empty() or excel_changed:
+        if not store.is_empty() and store.get_meta("excel_dirty") == "1":
+            print("WARNING: Workbook changed outside, unexported changes are dropped")
 
-    # reset the index
-    df_lockerdb.set_index("rel_path", inplace=True)
+        # read db from excel
+        df_lockerdb = pd.read_excel(excel)
 
-    # treat data types
-    df_lockerdb.playcount = pd.to_numeric(df_lockerdb.playcount)
-    df_lockerdb.movie_rating = pd.to_numeric(df_lockerdb.movie_rating)
-    df_lockerdb.actor_rating = pd.to_numeric(df_lockerdb.actor_rating)
-    df_lockerdb.studio = df_lockerdb.studio.astype(str)
+        # reset the index
+        df_lockerdb.set_index("rel_path", inplace=True)
 
-    show_stats_overall()
+        # treat data types
+        treat_data_types(df_lockerdb)
+
+        store.replace_all(df_lockerdb)
+        store.set_meta("excel_stamp", file_stamp(excel))
+        store.set_meta("excel_dirty", "0")
+        key = snapshot_key(excel, store.generation())
+        save_snapshot(state_path(".snapshot"), key, df_lockerdb)
+    else:
+        # read db from the binary snapshot, or from the local store if the
+        # snapshot is missing or was taken from other data
+        key = snapshot_key(excel, store.generation())
+        df_lockerdb = load_snapshot(state_path(".snapshot"), key)
+        if df_lockerdb is not None:
+            # snapshots written before the compact schema are converted once
+            compact(df_lockerdb)
+            store.adopt(df_lockerdb)
+        else:
+            df_lockerdb = store.load()
+            treat_data_types(df_lockerdb)
+            save_snapshot(state_path(".snapshot"), key, df_lockerdb)
+
+    # persistence runs on a background thread from here on
+    writer = PersistenceWriter(persist)
+    writer.start()
+    atexit.register(gsheet_close)
+
+    # replay changes journaled after the last write, then fold them in.
+    # Actor changes are replayed on the actor table split off below
+    journal = Journal(state_path(".journal"))
+    records = journal.records()
+    movie_records = [record for record in records if record["op"] != "set_actor"]
+    if len(records) > 0:
+        myprint(f"Replaying {len(records)} journaled changes")
+        df_lockerdb = compact(replay(df_lockerdb, movie_records))
+
+    # actor attributes live in their own table from here on, they are
+    # joined back for persisting and exporting
+    db_columns = df_lockerdb.columns.tolist()
+    df_lockerdb, actors = ActorTable.split(df_lockerdb, store.load_actors())
+    for record in records:
+        if record["op"] == "set_actor":
+            actors.set(record["actor"], record["col"], record["value"])
+    sampler.actors = actors
+    if len(records) > 0:
+        gsheet_write()
 
 
 def gsheet_write():
-    global df_lockerdb
+    # compaction: move the journal aside together with a consistent copy of
+    # the frame, the writer thread persists it without blocking the menu
+    with db_lock:
+        rotation = journal.rotate()
+        writer.submit(actors.join(df_lockerdb, db_columns), rotation, actors.df.copy())
 
-    # retreat data types
-    df_lockerdb.playcount = df_lockerdb.playcount.map(lambda x: str(x))
-    df_lockerdb.movie_rating = df_lockerdb.movie_rating.map(lambda x: str(x))
-    df_lockerdb.actor_rating = df_lockerdb.actor_rating.map(lambda x: str(x))
-    df_lockerdb = df_lockerdb.fillna("")
 
-    # reset index
-    _df_lockerdb = df_lockerdb.reset_index(names="rel_path")
+def persist(df, rotation, actor_df):
+    # runs on the writer thread: write only the rows which changed since
+    # the last write, then drop the journal that is now persisted
+    if store.sync(df) > 0:
+        store.set_meta("excel_dirty", "1")
+    store.sync_actors(actor_df)
+    journal.discard_rotated(rotation)
+
+    if config["DEFAULT"].get("EXCEL_EXPORT", "exit") == "always":
+        excel_export(df)
+
+
+def excel_export(df):
+    # stringify on a copy, the live frame keeps its compact columns
+    _df_lockerdb = export_frame(df)
 
     # write db to google sheet
     # myprint("Writing database")
@@ -74,15 +205,143 @@ def gsheet_write():
     # ws.update([_df_lockerdb.columns.values.tolist()] + _df_lockerdb.values.tolist())
 
     # write db to excel
-    _df_lockerdb.to_excel(config["DEFAULT"]["EXCEL"], index=False)
+    excel = config["DEFAULT"]["EXCEL"]
+    _df_lockerdb.to_excel(excel, index=False)
+    store.set_meta("excel_stamp", file_stamp(excel))
+    store.set_meta("excel_dirty", "0")
 
 
-def fix_movie_folder():
+def gsheet_close():
+    # flush-on-exit: final write, wait for the writer, then export the
+    # workbook if anything changed in this session
+    global store
+    if store is None:
+        return
+    if watcher is not None:
+        watcher.stop()
+    gsheet_write()
+    writer.stop()
+    df = actors.join(df_lockerdb, db_columns)
+    export = config["DEFAULT"].get("EXCEL_EXPORT", "exit")
+    if export == "exit" and store.get_meta("excel_dirty") == "1":
+        myprint("Exporting database to workbook")
+        excel_export(df)
+
+    # leave a fresh snapshot behind for a fast start next time
+    key = snapshot_key(config["DEFAULT"]["EXCEL"], store.generation())
+    save_snapshot(state_path(".snapshot"), key, df)
+    journal.close()
+    events.close()
+    store.close()
+    store = None
+
+
+def journal_append(*records):
+    # O(1) persistence of a single change, compact once the journal grows
+    journal.append(*records)
+    if journal.count >= int(config["DEFAULT"].get("JOURNAL_LIMIT", "500")):
+        gsheet_write()
+
+
+def update_movie(rel_path, col, value):
+    with db_lock:
+        old = df_lockerdb.at[rel_path, col]
+        if col == "actor":
+            actors.add([value])
+        allow_value(df_lockerdb, col, value)
+        df_lockerdb.at[rel_path, col] = value
+        pos = df_lockerdb.index.get_loc(rel_path)
+        selection.update(df_lockerdb, [pos], col, [old], value)
+        journal_append({"op": "set", "rel_path": rel_path, "col": col, "value": value})
+
+
+def update_actor(actor, col, value):
+    # one row of the actor table, the movie rows get it on the next join
+    with db_lock:
+        actors.set(actor, col, value)
+        journal_append({"op": "set_actor", "actor": actor, "col": col, "value": value})
+
+
+def forget_movies(rel_paths):
+    # drop entries from the database, the files are gone already
+    global df_lockerdb
+    with db_lock:
+        rel_paths = [p for p in rel_paths if p in df_lockerdb.index]
+        if len(rel_paths) == 0:
+            return
+        df_lockerdb = df_lockerdb.drop(rel_paths)
+        journal_append(*[{"op": "del", "rel_path": rel_path} for rel_path in rel_paths])
+
+
+def scan_threads():
+    # parallel folder listings and file checks of the scanner
+    return int(config["DEFAULT"].get("SCAN_THREADS", "4"))
+
+
+def scan_movie_folder(quiet=False):
+    # one pass over the movie folder, studios are scanned in parallel.
+    # Folders unchanged since the last scan are taken from the manifest
+    max_workers = scan_threads()
+    manifest = None
+    if config["DEFAULT"].get("SCAN_INCREMENTAL", "1") == "1":
+        manifest = load_manifest(state_path(".manifest"))
+    inventory = scan(config["DEFAULT"]["MOVIEDIR"], max_workers, manifest)
+    for path, e in inventory.errors:
+        print(f"Warning: Could not read {path}: {e}")
+    save_manifest(state_path(".manifest"), inventory)
+    if not quiet:
+        print(
+            f"Scanned movie folder: {inventory.listed} folders read, "
+            f"{inventory.reused} unchanged"
+        )
+    return inventory
+
+
+def find_movie_duplicates(inventory):
+    """Groups of identical movie files in a scanned movie folder"""
+    max_workers = scan_threads()
+    index = FingerprintIndex(state_path(".fingerprints"))
+    entries = [
+        entry for entry in inventory.files if not entry.bad_name and entry.ext in EXTLIST
+    ]
+    groups = find_duplicates(entries, index, max_workers)
+    index.save()
+    return groups
+
+
+def duplicate_rank(rel_path):
+    # the copy with the most plays and best ratings is kept
+    if rel_path not in df_lockerdb.index:
+        return (-1, -1, -1, -len(rel_path))
+    row = df_lockerdb.loc[rel_path]
+    actor_rating = actors.get(row["actor"], "actor_rating")
+    values = pd.to_numeric(
+        pd.Series([row["playcount"], row["movie_rating"], actor_rating]),
+        errors="coerce",
+    ).fillna(0)
+    return (*values.tolist(), -len(rel_path))
+
+
+def duplicate_info(rel_path):
+    if rel_path not in df_lockerdb.index:
+        return "(not in database)"
+    row = df_lockerdb.loc[rel_path]
+    return (
+        f"(played {row['playcount']}, movie rating {row['movie_rating']}, "
+        f"actor rating {actors.get(row['actor'], 'actor_rating')})"
+    )
+
+
+def fix_movie_folder(inventory=None):
     # strategy: fix movie folder should only fix problems in the movie folder.
     # It should not touch the database.
+    # Files deleted here are dropped from the inventory. Returns True when
+    # folders were renamed, the inventory is outdated then.
+    if inventory is None:
+        inventory = scan_movie_folder()
 
     # local variables
-    arr_filename_errors = []
+    arr_filename_errors = inventory.bad_dirs
     arr_dirname_errors = []
 
     # algorithm: try to print full path of all files. If some invalid
@@ -92,43 +351,25 @@ def fix_movie_folder():
     # assumption: only movie name or movie folder names can have errors.
     # Any other parent folder is very likely manually created.
 
-    # traverse through movie folder and check if all filenames are valid
+    # go through the scanned files, invalid filenames are already
+    # collected by the scanner
     arrDelete = []
     arrCase = []
-    arrEmptyFolders = []
-    for root, subdirs, files in os.walk(config["DEFAULT"]["MOVIEDIR"]):
-        if len(subdirs) + len(files) == 0:
-            arrEmptyFolders.append(root)
+    arrEmptyFolders = inventory.empty_dirs
+    for entry in inventory.files:
+        if entry.bad_name:
+            continue
 
-        for file in files:
-            path = os.path.join(root, file)
-            try:
-                # extract the relative path
-                rel_path = path[len(config["DEFAULT"]["MOVIEDIR"]) : :][1:]
-
-                # mark non movie files for delete
-                ext = os.path.splitext(path)[1]
-                if ext not in EXTLIST:
-                    arrDelete.append(rel_path)
-
-                # convert actor name to title case
-                folder1 = None
-                folder2 = None
-                head = path
-                while True:
-                    head, tail = os.path.split(head)
-                    folder2 = folder1
-                    folder1 = tail
-                    if head == config["DEFAULT"]["MOVIEDIR"]:
-                        break
-                actor = folder2
-                if actor != actor.title():
-                    partpath = path[: path.find(actor) + len(actor)]
-                    if partpath not in arrCase:
-                        arrCase.append(partpath)
+        # mark non movie files for delete
+        if entry.ext not in EXTLIST:
+            arrDelete.append(entry)
 
-            except UnicodeEncodeError:
-                arr_filename_errors.append(root)
+        # convert actor name to title case
+        actor = entry.actor
+        if actor is not None and actor != actor.title():
+            partpath = os.path.join(config["DEFAULT"]["MOVIEDIR"], entry.studio, actor)
+            if partpath not in arrCase:
+                arrCase.append(partpath)
 
     # delete all empty folders
     if len(arrEmptyFolders) > 0:
@@ -158,17 +399,22 @@ def fix_movie_folder():
 
     # delete the non movie files
     elif len(arrDelete) > 0:
-        for file in arrDelete:
-            print(file)
+        for entry in arrDelete:
+            print(entry.path[len(config["DEFAULT"]["MOVIEDIR"]) : :][1:])
         confirm = input(
             "\nThe above file are not movies and will be removed. Please confirm (y/n): "
         )
         if confirm == "y":
-            for rel_path in arrDelete:
+            from send2trash import send2trash
+
+            arrDeleted = []
+            for entry in arrDelete:
                 try:
-                    send2trash(os.path.join(config["DEFAULT"]["MOVIEDIR"], rel_path))
+                    send2trash(entry.path)
+                    arrDeleted.append(entry.rel_path)
                 except:
-                    print("ERROR: Cant delete file from filesystem", rel_path)
+                    print("ERROR: Cant delete file from filesystem", entry.rel_path)
+            inventory.discard(arrDeleted)
 
     # change actor names to title case
     elif len(arrCase) > 0:
@@ -191,85 +437,220 @@ def fix_movie_folder():
                 head, tail = os.path.split(partpath)
                 src = os.path.join(head, tail.title() + "_")
                 os.rename(src, src[:-1])
+            return True
 
     else:
-        print("\nNo errors found in movie folder")
+        # the same movie stored under several actors or studios. Last,
+        # since finding them reads the files
+        arrDuplicates = []
+        if config["DEFAULT"].get("DUPES_CHECK", "1") == "1":
+            arrDuplicates = find_movie_duplicates(inventory)
+
+        # delete duplicate movies, keeping the copy with the most history
+        if len(arrDuplicates) > 0:
+            arrDelete = []
+            print("The following movies exist more than once:")
+            for group in arrDuplicates:
+                keep = max(group, key=lambda entry: duplicate_rank(entry.rel_path))
+                print(f"\n{group[0].size/1024/1024:.1f} MB")
+                for entry in group:
+                    mark = "keep" if entry is keep else "del "
+                    print(f" [{mark}] {entry.rel_path} {duplicate_info(entry.rel_path)}")
+                    if entry is not keep:
+                        arrDelete.append(entry)
+            confirm = input(
+                "\nThe copies marked [del] will be removed. Please confirm (y/n): "
+            )
+            if confirm == "y":
+                from send2trash import send2trash
+
+                arrDeleted = []
+                for entry in arrDelete:
+                    try:
+                        send2trash(entry.path)
+                        arrDeleted.append(entry.rel_path)
+                    except:
+                        print("ERROR: Cant delete file from filesystem", entry.rel_path)
+                inventory.discard(arrDeleted)
+        else:
+            print("\nNo errors found in movie folder")
+    return False
 
 
 def add_movie(rel_path):
-    global df_lockerdb
-    print("Adding to database:", rel_path)
+    add_movies([rel_path])
 
-    # finding the actor name. Its basically the second folder from rel_path
-    folder1 = None
-    folder2 = None
-    head = rel_path
 
-    while True:
-        head, tail = os.path.split(head)
-        folder2 = folder1
-        folder1 = tail
-        if len(head) == 0:
-            break
-    actor = folder2
+def add_movies(rel_paths):
+    with db_lock:
+        _add_movies(rel_paths)
+
 
-    # create the entry
+def _add_movies(rel_paths):
+    global df_lockerdb
+    rel_paths = [p for p in rel_paths if p not in df_lockerdb.index]
+    if len(rel_paths) == 0:
+        return
+
+    # build all entries in one batch. The actor is the second folder and
+    # the studio the first folder of rel_path
+    arr_studio = []
+    arr_actor = []
+    for rel_path in rel_paths:
+        print("Adding to database:", rel_path)
+        studio, actor = split_db_path(rel_path)
+        arr_studio.append(studio)
+        arr_actor.append(actor)
     df = pd.DataFrame(
         {
-            "rel_path": [rel_path],
-            "movie_rating": [0],
-            "actor_rating": [get_actor_rating(actor)],
-            "playcount": [0],
-            "actor": [actor],
-            "category": ["Straight"],
-            "studio": [rel_path.split("\\")[0]],
+            "rel_path": rel_paths,
+            "movie_rating": 0,
+            "playcount": 0,
+            "actor": arr_actor,
+            "category": "Straight",
+            "studio": arr_studio,
             # "timestamp": [datetime.now().strftime("%Y-%m-%d_%H:%M:%S")]
         }
     )
     df.set_index("rel_path", inplace=True)
-    df_lockerdb = pd.concat([df_lockerdb, df])
+    df_lockerdb = compact(pd.concat([df_lockerdb, df]))
+    # new actors start unrated
+    actors.add(arr_actor)
+
+    records = [
+        {"op": "add", "rel_path": rel_path, "row": row}
+        for rel_path, row in zip(df.index, df.to_dict("records"))
+    ]
+    journal_append(*records)
+
+
+def source_path(movie):
+    """Absolute path of a movie in the movie folder"""
+    movie_path = movie
+    if platform.system() == "Linux":
+        movie_path = movie.replace("\\", "/")
+    return os.path.join(config["DEFAULT"]["MOVIEDIR"], movie_path)
+
+
+def plan_copy(candidates, destroot, capacity, weights=None):
+    """Pick movies out of candidates which fill capacity bytes at destroot.
+
+    Movies already at the destination or missing in the movie folder are
+    left out. With weights the candidates are taken in a weighted random
+    order, otherwise in the given order. Returns [(movie, size)] and the
+    total size.
+    """
+    max_workers = scan_threads()
+    margin = int(config["DEFAULT"].get("COPY_MARGIN_MB", "256")) * 1024 * 1024
+    candidates = pd.Index(candidates)
+    keep = np.ones(len(candidates), dtype=bool)
+
+    at_dest, _ = stat_paths(destroot, candidates, max_workers)
+    keep &= ~at_dest
+    found, sizes = stat_paths(
+        config["DEFAULT"]["MOVIEDIR"], candidates, max_workers, want_size=True
+    )
+    missing = keep & ~found
+    if missing.any():
+        print(f"Warning: {missing.sum()} movies not found in the movie folder, skipping")
+    keep &= found
+
+    candidates = candidates[keep]
+    sizes = sizes[keep]
+    order = None
+    if weights is not None:
+        order = weighted_order(np.asarray(weights)[keep])
+    chosen = plan_fill(sizes, capacity, order, margin)
+
+    movies = [(candidates[i], int(sizes[i])) for i in chosen]
+    return movies, int(sizes[chosen].sum())
+
+
+def resume_copy_job(destroot, kind):
+    """Offer to resume an unfinished copy job found at the destination.
+
+    Returns the job to resume, None to plan a new one, or False when the
+    user keeps an unfinished job of another kind and nothing is copied.
+    """
+    try:
+        job = CopyJob.load(destroot)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Warning: Could not read the copy job manifest: {e}")
+        return None
+    if job is None:
+        return None
+
+    print(
+        f"Found an unfinished {job.kind} copy job: "
+        f"{len(job.pending())} of {len(job.items)} files left"
+    )
+    if job.kind == kind:
+        cont = input("Do you want to resume it?\n 1. Yes\t 2. No ")
+        if cont == "1":
+            return job
+    else:
+        cont = input(f"Discard it and start a {kind} copy job?\n 1. Yes\t 2. No ")
+        if cont != "1":
+            return False
+    # start over, files already in place are skipped by the new plan
+    job.finish()
+    return None
 
 
 def copy_rated_movies():
-    min_rating = int(input("Enter min rating: "))
+    """Copy the best rated movies from the database to a destination folder"""
     destroot = input("Enter destination path: ")
-    max_size = int(input("Enter maximum size in GB: "))
+    os.makedirs(destroot, exist_ok=True)
 
-    # create a list of movies with at least given rating
-    select = pd.to_numeric(df_lockerdb["movie_rating"]) >= min_rating
-    arrMovies = df_lockerdb[select].index.to_list()
+    # same artefacts as a random copy, play_rpi.sh and the mini CSV files
+    install_player_script(destroot)
+    existing_movies, processed_actors = load_mini_db(destroot)
 
-    # copy the movies to a new folder
-    total_size = 0
-    for movie in arrMovies:
-        # Fix path separators for Linux compatibility
-        movie_path = movie
-        if platform.system() == "Linux":
-            movie_path = movie.replace("\\", "/")
-        
-        dest = os.path.join(destroot, movie_path)
-        if os.path.exists(dest):
-            continue
-            
-        src = os.path.join(config["DEFAULT"]["MOVIEDIR"], movie_path)
-        if not os.path.exists(src):
-            print(f"Warning: Source file not found, skipping: {src}")
-            continue
-            
-        size = os.path.getsize(src)
-        total_size += size
-        if total_size > max_size * 1024 * 1024 * 1024:
-            break
-        print(f"Copying {movie}. Total size {total_size/1024/1024/1024:.2f} GB")
-        
-        os.makedirs(os.path.dirname(dest), exist_ok=True)
-        shutil.copyfile(src, dest)
+    job = resume_copy_job(destroot, "rated")
+    if job is False:
+        return
+    if job is None:
+        min_rating = int(input("Enter min rating: "))
+        max_size = input("Enter maximum size in GB (empty for all free space): ")
+
+        # never plan more than fits on the destination
+        max_size_bytes = copy_budget(destroot)
+        if max_size.strip() != "":
+            max_size_bytes = min(max_size_bytes, int(max_size) * 1024 * 1024 * 1024)
+
+        # create a list of movies with at least given rating, best first,
+        # which are not in the CSV database yet
+        ratings = pd.to_numeric(df_lockerdb["movie_rating"])
+        unix_paths = df_lockerdb.index.str.replace("\\", "/", regex=False)
+        select = (ratings >= min_rating).to_numpy() & ~unix_paths.isin(list(existing_movies))
+        arrMovies = ratings[select].sort_values(ascending=False, kind="stable").index
+
+        # plan the movies to copy, filling max_size as far as possible
+        print("Analyzing movies to determine what fits...")
+        movies_to_copy, total_size = plan_copy(arrMovies, destroot, max_size_bytes)
+        if not movies_to_copy:
+            print("No new movies to copy (either all exist at destination/database or no space available)")
+            return
+
+        # read the files in the order they are laid out on the source disk
+        movies_to_copy = layout_order(movies_to_copy, lambda item: source_path(item[0]))
+        job = CopyJob(destroot, "rated", movies_to_copy)
+        job.save()
+    else:
+        movies_to_copy = job.pending()
+        total_size = sum(size for _, size in movies_to_copy)
+
+    print(f"Will copy {len(movies_to_copy)} movies ({total_size/1024/1024/1024:.2f} GB total)")
+
+    run_copy_job(job, destroot, existing_movies, processed_actors)
 
-    print("Done copying high rated movies")
 
+def copy_single_movie(movie_data, config, destroot, df_lockerdb, progress=None):
+    """Helper function to copy a single movie - used for parallel processing.
 
-def copy_single_movie(movie_data, config, destroot, use_rsync, df_lockerdb):
-    """Helper function to copy a single movie - used for parallel processing"""
+    Returns (movie, bytes copied, success, error message, seconds taken).
+    progress(n) is called for every chunk of n bytes copied.
+    """
     movie, file_size = movie_data
     
     # Fix path separators for Linux compatibility
@@ -282,56 +663,31 @@ def copy_single_movie(movie_data, config, destroot, use_rsync, df_lockerdb):
     
     # Create destination directory
     os.makedirs(os.path.dirname(dest), exist_ok=True)
+
+    # Copy under a temporary name and rename when done, so an interrupted
+    # copy never leaves a truncated file under the final name
+    final_dest = dest
+    dest = part_path(final_dest)
     
+    start = time.perf_counter()
     try:
-        # Copy the file using the best available method
-        if use_rsync:
-            # Use rsync with optimizations for large files
-            subprocess.run([
-                'rsync', 
-                '--progress',
-                '--compress-level=0',    # Disable compression for video files
-                '--whole-file',          # Don't use delta-transfer algorithm
-                '--inplace',            # Update destination files in-place
-                '--no-inc-recursive',   # Don't recursively scan directories
-                src, dest
-            ], check=True, capture_output=True)
-        elif platform.system() == "Linux":
-            # Use cp command with reflink for faster copying on compatible filesystems
-            subprocess.run(['cp', '--reflink=auto', src, dest], check=True)
-        else:
-            # Fallback to shutil for Windows
-            shutil.copyfile(src, dest)
-        
-        return movie, file_size, True, None
+        # Copy in-process: copy_file_range/sendfile, or large buffered writes
+        copied = copy_file(src, dest, progress)
+        os.replace(dest, final_dest)
+        return movie, copied, True, None, time.perf_counter() - start
         
     except Exception as e:
-        return movie, file_size, False, str(e)
+        # no partial file is left behind, a retry starts from scratch anyway
+        try:
+            if os.path.exists(dest):
+                os.remove(dest)
+        except OSError:
+            pass
+        return movie, file_size, False, str(e), time.perf_counter() - start
 
 
-def copy_random_movies():
-    """Copy random movies from the database to a destination folder"""
-    destroot = input("Enter destination path: ")
-    
-    # Create destination directory if it doesn't exist
-    os.makedirs(destroot, exist_ok=True)
-    
-    # Copy shell script to destination first (overwrite if exists)
-    script_name = "play_rpi.sh"
-    script_src = os.path.join(os.path.dirname(__file__), script_name)
-    script_dest = os.path.join(destroot, script_name)
-    
-    if os.path.exists(script_src):
-        try:
-            shutil.copyfile(script_src, script_dest)
-            # Make the shell script executable
-            os.chmod(script_dest, stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH)
-            print(f"Copied {script_name} to destination and made it executable")
-        except Exception as e:
-            print(f"Warning: Could not copy {script_name}: {e}")
-    else:
-        print(f"Warning: {script_name} not found in source directory")
-    
+def copy_budget(destroot):
+    """Bytes which can be copied to destroot, keeping a safety margin free"""
     # Calculate available space at destination
     try:
         statvfs = os.statvfs(destroot)
@@ -361,11 +717,56 @@ def copy_random_movies():
             max_size_bytes = 10 * 1024 * 1024 * 1024
             max_size_gb = 10
 
-    # Get all movies from the database and shuffle them
-    all_movies = df_lockerdb.index.to_list()
-    random.shuffle(all_movies)  # Shuffle in place for random selection
+    return max_size_bytes
+
+
+def plan_random_movies(destroot, existing_movies):
+    """Pick random movies which fit into the free space at the destination"""
+    max_size_bytes = copy_budget(destroot)
+
+    # Candidates are all movies which are not in the CSV database yet
+    unix_paths = df_lockerdb.index.str.replace("\\", "/", regex=False)
+    candidates = ~unix_paths.isin(list(existing_movies))
+
+    # Pick a random selection, optionally favouring some movies, which fills
+    # the free space. Movies that don't fit are skipped instead of ending it
+    print("Analyzing movies to determine what fits...")
+    weight = config["DEFAULT"].get("COPY_WEIGHT", "none")
+    if weight not in WEIGHT_MODES:
+        print(f"Warning: Unknown COPY_WEIGHT {weight}, copying unweighted")
+        weight = "none"
+    weights = copy_weights(actors.join(df_lockerdb, db_columns)[candidates], weight)
+    movies_to_copy, total_size = plan_copy(
+        df_lockerdb.index[candidates], destroot, max_size_bytes, weights
+    )
+
+    return movies_to_copy, total_size
+
+
+def install_player_script(destroot):
+    """Copy play_rpi.sh to a destination and make it executable"""
+    import stat
+
+    # overwrite if exists
+    script_name = "play_rpi.sh"
+    script_src = os.path.join(os.path.dirname(__file__), script_name)
+    script_dest = os.path.join(destroot, script_name)
     
-    # Load existing movies from CSV database before analyzing what to copy
+    if os.path.exists(script_src):
+        try:
+            shutil.copyfile(script_src, script_dest)
+            # Make the shell script executable
+            os.chmod(script_dest, stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH)
+            print(f"Copied {script_name} to destination and made it executable")
+        except Exception as e:
+            print(f"Warning: Could not copy {script_name}: {e}")
+    else:
+        print(f"Warning: {script_name} not found in source directory")
+
+
+def load_mini_db(destroot):
+    """Movies and actors already listed in the mini CSV files at a destination"""
+    # Load existing movies from CSV database
     csv_filename = f"LockerDB_mini.csv"
     csv_path = os.path.join(destroot, csv_filename)
     existing_movies = set()
@@ -390,156 +791,167 @@ def copy_random_movies():
             print(f"Found existing actor stats with {len(processed_actors)} actors")
         except Exception as e:
             print(f"Warning: Could not read existing actor stats file: {e}")
-    
-    # First pass: determine which movies can fit
-    movies_to_copy = []
-    total_size = 0
-    
-    print("Analyzing movies to determine what fits...")
-    for movie in all_movies:
-        movie_path = movie
-        if platform.system() == "Linux":
-            movie_path = movie.replace("\\", "/")
-        
-        # Convert movie path to Unix-style for comparison with CSV
-        unix_movie_path = movie.replace("\\", "/")
-        
-        # Skip if movie already exists in destination folder OR in CSV database
-        dest = os.path.join(destroot, movie_path)
-        if os.path.exists(dest) or unix_movie_path in existing_movies:
-            continue
-            
-        src = os.path.join(config["DEFAULT"]["MOVIEDIR"], movie_path)
-        if not os.path.exists(src):
-            continue
-            
-        size = os.path.getsize(src)
-        
-        # Check if adding this file would exceed available space
-        if total_size + size > max_size_bytes:
-            break
-            
-        movies_to_copy.append((movie, size))
-        total_size += size
-    
-    if not movies_to_copy:
-        print("No new movies to copy (either all exist at destination/database or no space available)")
-        return
-    
-    print(f"Will copy {len(movies_to_copy)} movies ({total_size/1024/1024/1024:.2f} GB total)")
-    
+
+    return existing_movies, processed_actors
+
+
+def run_copy_job(job, destroot, existing_movies, processed_actors):
+    """Copy the pending movies of a job and export them to the mini CSV files.
+
+    Copies run in parallel on the adaptive scheduler, are verified when
+    VERIFY=1 and are marked done in the job manifest as they finish.
+    Prints a throughput summary and returns the copied movies.
+    """
+    from tqdm import tqdm
+    from concurrent.futures import ThreadPoolExecutor
+
+    movies_to_copy = job.pending()
+    csv_filename = "LockerDB_mini.csv"
+    csv_path = os.path.join(destroot, csv_filename)
+    actor_stats_filename = "actor_stats.csv"
+    actor_stats_path = os.path.join(destroot, actor_stats_filename)
+
     # Create list to track copied movies for Excel export
     copied_movies = []
     current_size = 0
+    file_speeds = []  # MB/s of every copied file
     
-    # Check if rsync is available on Linux
-    use_rsync = False
-    if platform.system() == "Linux":
-        try:
-            subprocess.run(['rsync', '--version'], capture_output=True, check=True)
-            use_rsync = True
-            print("Using rsync for faster copying on Linux")
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print("rsync not found, using cp with reflink")
-    
-    # Initialize CSV files if they don't exist
-    if not os.path.exists(csv_path):
-        # Create empty dataframe with same structure as the database, excluding actor_rating
-        movie_columns = ['rel_path'] + [col for col in df_lockerdb.columns.tolist() if col != 'actor_rating']
-        copied_df = pd.DataFrame(columns=movie_columns)
-        copied_df.to_csv(csv_path, index=False)
-    
-    if not os.path.exists(actor_stats_path):
-        # Create empty actor_stats.csv file
-        actor_stats_df = pd.DataFrame(columns=['actor', 'actor_rating', 'actor_category'])
-        actor_stats_df.to_csv(actor_stats_path, index=False)
-    
-    # Get number of parallel copies from config
+    # Get the upper bound of parallel copies from config, the scheduler
+    # tunes the copies in flight per source/destination device below it
     max_workers = int(config["DEFAULT"].get("MAX_THREADS", "1"))
-    print(f"Using {max_workers} parallel threads for copying (configured in config.ini)")
+    print(f"Using up to {max_workers} parallel copies, adapted per device (MAX_THREADS in config.ini)")
     
-    # Use threading lock for CSV file updates to prevent corruption
-    csv_lock = threading.Lock()
+    # Stream rows to the CSV files as movies finish, creating them if they don't
+    # exist. Same structure as the database, excluding actor_rating
+    movie_columns = ['rel_path'] + [col for col in df_lockerdb.columns.tolist() if col != 'actor_rating']
+    csv_writer = MiniCsvWriter(csv_path, movie_columns, actor_stats_path, processed_actors)
+
+    def add_csv_row(movie):
+        # Get the movie data from the main database
+        movie_data_dict = df_lockerdb.loc[movie].copy().to_dict()
+        # Convert to Unix-style path for CSV file
+        movie_data_dict['rel_path'] = movie.replace("\\", "/")
+        # Reset playcount to 0 for the copied movies
+        movie_data_dict['playcount'] = 0
+
+        actor_name = movie_data_dict.get('actor', '')
+        actor_rating = actors.get(actor_name, 'actor_rating')
+        actor_category = actors.get(actor_name, 'actor_category')
+
+        # Queue the rows, the writer appends them in batches
+        csv_writer.add(movie_data_dict, actor_name, actor_rating, actor_category)
+
+    # Files finished by an interrupted run may be missing their CSV rows
+    for movie in job.done:
+        if movie.replace("\\", "/") not in existing_movies and movie in df_lockerdb.index:
+            add_csv_row(movie)
     
-    def update_csv_files(movie, movie_data_dict, actor_rating, actor_name):
-        """Thread-safe CSV file updates"""
-        with csv_lock:
+    def movie_done(movie):
+        job.mark_done(movie)
+
+        # Update CSV file after successful copy
+        try:
+            add_csv_row(movie)
+        except Exception as csv_error:
+            print(f"Warning: Could not update CSV file for {movie}: {csv_error}")
+
+    # Optionally verify every copy: source and destination are hashed on a
+    # separate pool while the next files are copying, a movie only counts
+    # as done once its checksums match
+    verify = config["DEFAULT"].get("VERIFY", "0") == "1"
+    verifications = {}  # future -> (movie, size)
+    failed_verify = []
+    if verify:
+        print("Verifying copied movies with blake2b checksums")
+        verify_pool = ThreadPoolExecutor(max_workers=max_workers)
+        digest_log = DigestLog(destroot)
+
+    def check_verifications(wait):
+        for future in list(verifications):
+            if not wait and not future.done():
+                continue
+            movie, size = verifications.pop(future)
             try:
-                # Remove actor_rating from movie data
-                if 'actor_rating' in movie_data_dict:
-                    movie_data_dict.pop('actor_rating')
-                
-                # Add actor to actor_stats.csv if not already processed
-                if actor_name and actor_name not in processed_actors:
-                    processed_actors.add(actor_name)
-                    
-                    # Read current actor_stats CSV file, append new row, and write back
-                    current_actor_df = pd.read_csv(actor_stats_path)
-                    new_actor_row = {
-                        'actor': actor_name,
-                        'actor_rating': actor_rating,
-                        'actor_category': ''  # Blank as requested
-                    }
-                    new_actor_row_df = pd.DataFrame([new_actor_row])
-                    updated_actor_df = pd.concat([current_actor_df, new_actor_row_df], ignore_index=True)
-                    updated_actor_df.to_csv(actor_stats_path, index=False)
-                
-                # Read current CSV file, append new row, and write back
-                current_df = pd.read_csv(csv_path)
-                new_row_df = pd.DataFrame([movie_data_dict])
-                updated_df = pd.concat([current_df, new_row_df], ignore_index=True)
-                updated_df.to_csv(csv_path, index=False)
-                
-            except Exception as csv_error:
-                print(f"Warning: Could not update CSV file for {movie}: {csv_error}")
-    
+                digest, error = future.result()
+            except Exception as e:
+                digest, error = None, str(e)
+            if error is None:
+                digest_log.append(movie.replace("\\", "/"), size, digest)
+                movie_done(movie)
+            else:
+                # drop the bad copy, the job copies it again on the next run
+                print(f"Verification failed for {movie}: {error}")
+                failed_verify.append(movie)
+                dest = os.path.join(destroot, movie.replace("\\", "/"))
+                if os.path.exists(dest):
+                    os.remove(dest)
+
     # Record start time for performance tracking
     copy_start_time = time.time()
     
-    # Copy files using ThreadPoolExecutor for parallel processing
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all copy tasks
-        future_to_movie = {
-            executor.submit(copy_single_movie, movie_data, config, destroot, use_rsync, df_lockerdb): movie_data 
-            for movie_data in movies_to_copy
-        }
-        
-        # Process completed tasks with progress tracking
-        for future in tqdm(as_completed(future_to_movie), total=len(movies_to_copy), desc="Copying movies"):
-            movie_data = future_to_movie[future]
+    # Group the copies by the devices they read from and write to
+    scheduler = AdaptiveCopyScheduler(copy_single_movie, max_workers)
+    dest_dev = device_of(destroot)
+    src_devs = {}  # source folder -> device
+    for movie_data in movies_to_copy:
+        src_dir = os.path.dirname(source_path(movie_data[0]))
+        if src_dir not in src_devs:
+            try:
+                src_devs[src_dir] = device_of(src_dir)
+            except OSError:
+                src_devs[src_dir] = device_of(config["DEFAULT"]["MOVIEDIR"])
+        scheduler.add(src_devs[src_dir], dest_dev, movie_data, config, destroot, df_lockerdb)
+
+    # Copy files in parallel, processing them as they complete
+    with tqdm(total=len(movies_to_copy), desc="Copying movies") as progress:
+        for (movie_data, *_), future in scheduler.run():
+            progress.update(1)
             movie, file_size = movie_data
             
             try:
-                movie_result, file_size_result, success, error_msg = future.result()
+                movie_result, file_size_result, success, error_msg, seconds = future.result()
                 
                 if success:
                     copied_movies.append(movie_result)
                     current_size += file_size_result
+                    if seconds > 0:
+                        file_speeds.append(file_size_result / 1024 / 1024 / seconds)
+                        progress.set_postfix_str(f"{file_speeds[-1]:.1f} MB/s")
                     
-                    # Update CSV file after successful copy
-                    try:
-                        # Get the movie data from the main database
-                        movie_data_dict = df_lockerdb.loc[movie_result].copy().to_dict()
-                        # Convert to Unix-style path for CSV file
-                        unix_rel_path = movie_result.replace("\\", "/")
-                        movie_data_dict['rel_path'] = unix_rel_path
-                        # Reset playcount to 0 for the copied movies
-                        movie_data_dict['playcount'] = 0
-                        
-                        actor_rating = movie_data_dict.get('actor_rating', 0)
-                        actor_name = movie_data_dict.get('actor', '')
-                        
-                        # Update CSV files in thread-safe manner
-                        update_csv_files(movie_result, movie_data_dict, actor_rating, actor_name)
-                        
-                    except Exception as csv_error:
-                        print(f"Warning: Could not update CSV file for {movie_result}: {csv_error}")
+                    if verify:
+                        dest = os.path.join(destroot, movie_result.replace("\\", "/"))
+                        verification = verify_pool.submit(verify_copy, source_path(movie_result), dest)
+                        verifications[verification] = (movie_result, file_size_result)
+                    else:
+                        movie_done(movie_result)
                 else:
                     print(f"Failed to copy {movie_result}: {error_msg}")
                     
             except Exception as e:
                 print(f"Unexpected error processing {movie}: {e}")
 
+            if verify:
+                check_verifications(False)
+
+    # Wait for the remaining verifications
+    if verify:
+        check_verifications(True)
+        verify_pool.shutdown()
+        digest_log.close()
+
+    # Write out the remaining rows and fsync both CSV files
+    try:
+        csv_writer.close()
+    except Exception as csv_error:
+        print(f"Warning: Could not update CSV files: {csv_error}")
+
+    # Keep the job manifest while files are missing, the next run resumes it
+    if len(job.pending()) == 0:
+        job.finish()
+    else:
+        job.close()
+        print(f"{len(job.pending())} movies not copied, run again to resume the job")
+
     # Final summary (CSV files already exist and are up to date)
     if copied_movies:
         if os.path.exists(csv_path) and len(existing_movies) > 0:
@@ -563,22 +975,219 @@ def copy_random_movies():
     print(f"Total size copied: {current_size/1024/1024/1024:.2f} GB")
     print(f"Total time taken: {total_copy_time/60:.1f} minutes ({total_copy_time:.1f} seconds)")
     print(f"Average copy speed: {speed_mbps:.1f} MB/s")
-    print(f"Parallel threads used: {max_workers}")
+    if file_speeds:
+        file_speeds.sort()
+        print(f"Per-file copy speed: median {file_speeds[len(file_speeds) // 2]:.1f} MB/s "
+              f"(slowest {file_speeds[0]:.1f}, fastest {file_speeds[-1]:.1f})")
+    for group in scheduler.groups.values():
+        print(f"Parallel copies {group.describe()}")
     if len(movies_to_copy) > len(copied_movies):
         failed_count = len(movies_to_copy) - len(copied_movies)
         print(f"Failed copies: {failed_count}")
+    if verify:
+        print(f"Verified copies: {len(copied_movies) - len(failed_verify)}")
+        if failed_verify:
+            print(f"Failed verification (removed): {len(failed_verify)}")
     print("="*60 + "\n")
 
+    return copied_movies
+
+
+def copy_random_movies():
+    """Copy random movies from the database to a destination folder"""
+    destroot = input("Enter destination path: ")
+    
+    # Create destination directory if it doesn't exist
+    os.makedirs(destroot, exist_ok=True)
+    
+    # Copy shell script to destination first (overwrite if exists)
+    install_player_script(destroot)
+
+    # Load existing movies from CSV database before analyzing what to copy
+    existing_movies, processed_actors = load_mini_db(destroot)
+
+    # Pick up an interrupted job instead of planning a new one
+    job = resume_copy_job(destroot, "random")
+    if job is False:
+        return
+    if job is None:
+        movies_to_copy, total_size = plan_random_movies(destroot, existing_movies)
+        if not movies_to_copy:
+            print("No new movies to copy (either all exist at destination/database or no space available)")
+            return
+        # The selection stays random, but copy it in the order the files are
+        # laid out on the source disk so the reads are mostly sequential
+        movies_to_copy = layout_order(movies_to_copy, lambda item: source_path(item[0]))
+        job = CopyJob(destroot, "random", movies_to_copy)
+        job.save()
+    else:
+        movies_to_copy = job.pending()
+        total_size = sum(size for _, size in movies_to_copy)
+    
+    print(f"Will copy {len(movies_to_copy)} movies ({total_size/1024/1024/1024:.2f} GB total)")
+    
+    run_copy_job(job, destroot, existing_movies, processed_actors)
+
+
+def plan_destination(destroot, candidates, weights=None):
+    """Mirror plan which turns destroot into the best fitting part of candidates.
+
+    None when the movie folder is not available, every movie would look
+    missing and be evicted.
+    """
+    if not os.path.isdir(config["DEFAULT"]["MOVIEDIR"]):
+        print("Movie folder not available, cannot plan the sync")
+        return None
+    max_workers = scan_threads()
+    margin = int(config["DEFAULT"].get("COPY_MARGIN_MB", "256")) * 1024 * 1024
+
+    # movies the destination holds according to its mini CSV
+    existing_movies, _ = load_mini_db(destroot)
+    managed = pd.Index([rel_path.replace("/", "\\") for rel_path in existing_movies])
+    on_dest, dest_sizes = stat_paths(destroot, managed, max_workers, want_size=True)
+    present = dict(zip(managed[on_dest], dest_sizes[on_dest].tolist()))
+    stale = managed[~on_dest].tolist()
+
+    # files at the destination which are not in the mini CSV are left alone
+    candidates = pd.Index(candidates)
+    at_dest, _ = stat_paths(destroot, candidates, max_workers)
+    found, sizes = stat_paths(
+        config["DEFAULT"]["MOVIEDIR"], candidates, max_workers, want_size=True
+    )
+    # present movies are kept also when their source can not be read
+    there = candidates.isin(list(present))
+    dest_sizes = pd.Series(candidates).map(present).fillna(-1).to_numpy(np.int64)
+    sizes = np.where(found, sizes, dest_sizes)
+    keep = there | (found & ~at_dest)
+
+    # the present movies count as free space, they may be evicted
+    capacity = copy_budget(destroot) + sum(present.values())
+    order = None
+    if weights is not None:
+        # a new random order on every run, the movies already there go
+        # first so that syncing again does not trade them for others
+        order = weighted_order(np.asarray(weights)[keep])
+        order = order[np.argsort(~there[keep][order], kind="stable")]
+    return plan_mirror(
+        candidates[keep], sizes[keep], present, capacity, order, margin, stale
+    )
+
+
+def evict_movies(destroot, rel_paths):
+    """Remove movies from a destination, with their mini CSV rows and digests"""
+    for rel_path in rel_paths:
+        path = os.path.join(destroot, *rel_path.split("\\"))
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        # drop the actor and studio folders once they are empty
+        folder = os.path.dirname(path)
+        while os.path.normpath(folder) != os.path.normpath(destroot):
+            try:
+                os.rmdir(folder)
+            except OSError:
+                break
+            folder = os.path.dirname(folder)
+
+    unix_paths = [rel_path.replace("\\", "/") for rel_path in rel_paths]
+    drop_rows(os.path.join(destroot, "LockerDB_mini.csv"), unix_paths)
+    DigestLog(destroot).drop(unix_paths)
+
+
+def sync_destination():
+    """Make a destination hold exactly a desired set of movies"""
+    destroot = input("Enter destination path: ")
+    os.makedirs(destroot, exist_ok=True)
+
+    job = resume_copy_job(destroot, "mirror")
+    if job is False:
+        return
+    if job is None:
+        choice = input(
+            "Desired content:\n 1. Movies with at least a given rating\t 2. Random sample "
+        )
+        weights = None
+        if choice == "1":
+            min_rating = int(input("Enter min rating: "))
+            ratings = pd.to_numeric(df_lockerdb["movie_rating"])
+            # best rated movies first, when they don't all fit
+            candidates = ratings[ratings >= min_rating].sort_values(ascending=False, kind="stable").index
+        else:
+            candidates = df_lockerdb.index
+            weight = config["DEFAULT"].get("COPY_WEIGHT", "none")
+            weights = copy_weights(
+                actors.join(df_lockerdb, db_columns),
+                weight if weight in WEIGHT_MODES else "none",
+            )
+
+        print("Analyzing destination...")
+        plan = plan_destination(destroot, candidates, weights)
+        if plan is None:
+            return
+        print("\nSync plan:")
+        for line in describe_plan(plan):
+            print(" " + line)
+        if len(plan.copy) + len(plan.evict) + len(plan.stale) == 0:
+            print("Destination is already in sync")
+            return
+        cont = input("Do you want to sync now?\n 1. Yes\t 2. No (dry run) ")
+        if cont != "1":
+            return
+
+        # evict first, the copies need the space
+        evict_movies(destroot, [rel_path for rel_path, _ in plan.evict] + plan.stale)
+        movies_to_copy = layout_order(plan.copy, lambda item: source_path(item[0]))
+        job = CopyJob(destroot, "mirror", movies_to_copy)
+        job.save()
+
+    install_player_script(destroot)
+    existing_movies, processed_actors = load_mini_db(destroot)
+    run_copy_job(job, destroot, existing_movies, processed_actors)
+
+
+def verify_copied_movies():
+    """Re-check copied movies against the digests recorded at the destination"""
+    from tqdm import tqdm
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    destroot = input("Enter destination path: ")
+    digests = DigestLog(destroot).load()
+    if len(digests) == 0:
+        print("No checksums found at destination, copy with VERIFY=1 in config.ini first")
+        return
+
+    # only the destination is read, the digests stand in for the source
+    max_workers = int(config["DEFAULT"].get("MAX_THREADS", "1"))
+    bad = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(verify_file, os.path.join(destroot, *rel_path.split("/")), size, digest): rel_path
+            for rel_path, (size, digest) in digests.items()
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Verifying movies"):
+            error = future.result()
+            if error is not None:
+                bad.append((futures[future], error))
+
+    print(f"Verified {len(digests) - len(bad)} of {len(digests)} movies")
+    for rel_path, error in sorted(bad):
+        print(f"  {error}: {rel_path}")
+
+
 def delete_movie(rel_path):
+    from send2trash import send2trash
+
     global df_lockerdb
     print("deleting file: ", rel_path)
     full_path = os.path.join(config["DEFAULT"]["MOVIEDIR"], rel_path)
     if platform.system() == "Linux":
         full_path = full_path.replace("\\", "/")
     send2trash(full_path)
-    try:
-        df_lockerdb.drop(rel_path, inplace=True)
-    except:
+    if rel_path in df_lockerdb.index:
+        events.append("delete", rel_path, df_lockerdb.at[rel_path, "actor"])
+        forget_movies([rel_path])
+    else:
         print("ERROR: Cant delete file from database")
     
     # Create path to to_delete.txt file in MOVIEDIR
@@ -592,14 +1201,22 @@ def delete_movie(rel_path):
 
 
 def refresh_db():
-    fix_movie_folder()
+    global df_lockerdb
 
-    # check for non-existent entries in database
-    arrDelete = []
-    for rel_path in df_lockerdb.index.to_list():
-        full_path = os.path.join(config["DEFAULT"]["MOVIEDIR"], rel_path)
-        if not os.path.exists(full_path):
-            arrDelete.append(rel_path)
+    # the folder fixer and the refresh share a single scan, unless the
+    # fixer renamed folders
+    inventory = scan_movie_folder()
+    if fix_movie_folder(inventory):
+        inventory = scan_movie_folder()
+    # files with invalid names cannot be stored, they were reported above
+    disk_paths = [entry.rel_path for entry in inventory.files if not entry.bad_name]
+    arrAdd, arrDelete = diff_paths(df_lockerdb.index.to_list(), disk_paths)
+
+    # check for non-existent entries in database. Entries the scan did not
+    # see are confirmed directly, listing every parent folder only once
+    max_workers = scan_threads()
+    mask = missing_mask(arrDelete, config["DEFAULT"]["MOVIEDIR"], max_workers)
+    arrDelete = [rel_path for rel_path, missing in zip(arrDelete, mask) if missing]
     if len(arrDelete) > 0:
         for rel_path in arrDelete:
             print(rel_path)
@@ -607,28 +1224,96 @@ def refresh_db():
             "The above files are not found in filesystem. Remove them from database?\n 1. Yes\t 2. No "
         )
         if delete == "1":
-            for rel_path in arrDelete:
-                try:
-                    df_lockerdb.drop(rel_path, inplace=True)
-                except:
-                    print("ERROR: Cant delete file from database", rel_path)
+            forget_movies(arrDelete)
             print("Done removing files")
 
     # add any new files
-    for root, subdirs, files in os.walk(config["DEFAULT"]["MOVIEDIR"]):
-        for file in files:
-            # add to database if not exist already
-            # assuming non-movie files are already deleted
-            path = os.path.join(root, file)
-            rel_path = path[len(config["DEFAULT"]["MOVIEDIR"]) : :][1:]
-            if rel_path not in df_lockerdb.index.to_list():
-                add_movie(rel_path)
+    # assuming non-movie files are already deleted
+    add_movies(arrAdd)
 
     gsheet_write()
     print("\nDatabase refresh completed.")
 
 
+def watch_start():
+    # keep the database in sync with the movie folder in the background
+    global watcher
+    watcher = Watcher(
+        config["DEFAULT"]["MOVIEDIR"],
+        apply_watch_changes,
+        watch_listing,
+        debounce=float(config["DEFAULT"].get("WATCH_DEBOUNCE", "2")),
+        poll_interval=float(config["DEFAULT"].get("WATCH_POLL", "30")),
+    )
+    watcher.start()
+    print(f"Watching movie folder for changes ({watcher.mode})")
+
+
+def watch_listing():
+    # movies for the polling watch, None when the movie folder could not be
+    # read completely (e.g. unmounted), the poll is skipped then
+    inventory = scan_movie_folder(quiet=True)
+    if len(inventory.errors) > 0:
+        return None
+    return inventory.rel_paths()
+
+
+def apply_watch_changes(added, removed, removed_dirs, resync):
+    # runs on the watch thread, same semantics as refresh without prompts.
+    # The rescan runs outside of db_lock, only applying the diff holds it
+    if not os.path.isdir(config["DEFAULT"]["MOVIEDIR"]):
+        print("\n[watch] Movie folder not available, changes are not applied")
+        return
+    unread = []
+    disk_paths = None
+    if resync:
+        inventory = scan_movie_folder(quiet=True)
+        unread = inventory.unread_prefixes()
+        if "" in unread:
+            print("\n[watch] Movie folder not readable, changes are not applied")
+            return
+        disk_paths = [e.rel_path for e in inventory.files if not e.bad_name]
+
+    with db_lock:
+        if disk_paths is not None:
+            added, removed = diff_paths(df_lockerdb.index.to_list(), disk_paths)
+
+        # a removed folder takes all movies below it along
+        for rel_dir in removed_dirs:
+            select = df_lockerdb.index.str.startswith(rel_dir + "\\")
+            removed = removed + df_lockerdb.index[select].to_list()
+        # movies below folders which could not be listed are unknown, not gone
+        removed = [
+            p
+            for p in dict.fromkeys(removed)
+            if p in df_lockerdb.index and not p.startswith(tuple(unread))
+        ]
+        added = [
+            rel_path
+            for rel_path in added
+            if os.path.splitext(rel_path)[1] in EXTLIST
+            and rel_path not in df_lockerdb.index
+        ]
+        if len(added) + len(removed) == 0:
+            return
+
+        # removing most of the library is more likely a disk problem than a
+        # cleanup, leave that to "Refresh database" which asks first
+        if len(removed) > WATCH_MAX_REMOVE * len(df_lockerdb):
+            print(
+                f"\n[watch] {len(removed)} of {len(df_lockerdb)} movies seem to be "
+                "gone, not removing them. Use Refresh database to confirm"
+            )
+            removed = []
+
+        print(f"\n[watch] {len(added)} movies added, {len(removed)} removed")
+        forget_movies(removed)
+        add_movies(added)
+
+
 def play_movie(rel_path):
+    import subprocess
+
     # filename validation
     full_path = f"{os.path.join(config['DEFAULT']['MOVIEDIR'], rel_path)}"
     if platform.system() == "Linux":
@@ -638,9 +1323,9 @@ def play_movie(rel_path):
         return
 
     # increment the playcount
-    df_lockerdb.at[rel_path, "playcount"] = (
-        int(df_lockerdb.at[rel_path, "playcount"]) + 1
-    )
+    update_movie(rel_path, "playcount", int(df_lockerdb.at[rel_path, "playcount"]) + 1)
+    sampler.played(rel_path)
+    events.append("play", rel_path, df_lockerdb.at[rel_path, "actor"])
 
     # open player (suppress player console logs on Linux)
     # Sanitize player path (config may contain quotes)
@@ -681,10 +1366,32 @@ def play_movie(rel_path):
     show_menu_postplay(rel_path)
 
 
+def next_movie(mode, pool):
+    """Next movie of a play menu, None when its pool is empty.
+
+    pool() returns the row positions to pick from. It is called on every
+    pick, the watch thread may have replaced df_lockerdb meanwhile.
+    """
+    with db_lock:
+        idx = sampler.pick_movie(df_lockerdb, mode, pool())
+        return None if idx is None else df_lockerdb.index[idx]
+
+
+def next_actor(mode, pool):
+    """Next actor of a play menu, like next_movie()"""
+    with db_lock:
+        return sampler.pick_actor(df_lockerdb, mode, pool())
+
+
+def no_picks(what):
+    print(f"No {what} found!")
+    input("Press Enter to continue...")
+
+
 # Play movies for a given actor. If no actor specified, prompt for one.
 def play_actor(actor=None):
     # generate list of actors
-    list_actors = df_lockerdb["actor"].drop_duplicates().to_list()
+    list_actors = selection.keys(df_lockerdb, "actor")
 
     # if no actor is specified, prompt for the actor name.
     # partial match is ok. list all actors matching the name.
@@ -712,13 +1419,14 @@ def play_actor(actor=None):
             actor = arrActor[i]
 
     # select a random movie for the actor
-    select = df_lockerdb["actor"] == actor
     while True:
-        nrows, _ = df_lockerdb[select].shape
-
         # get a random file
-        idx = random.randrange(0, nrows, 1)
-        rel_path = df_lockerdb[select].iloc[idx].name
+        rel_path = next_movie(
+            ("actor", actor), lambda: selection.positions(df_lockerdb, "actor", actor)
+        )
+        if rel_path is None:
+            no_picks("movies")
+            break
         show_stats_movie(rel_path)
 
         # # play the movie on user request
@@ -757,14 +1465,16 @@ def play_something():
 def play_rated_movie():
     print("\nPlay a high rated movie")
 
-    # create a list of movies with at least given rating
-    select = pd.to_numeric(df_lockerdb["movie_rating"]) >= 5
-    arrMovies = df_lockerdb[select].index.to_list()
+    # movies with at least given rating
+    def pool():
+        return selection.positions_where(df_lockerdb, "movie_rating", lambda r: r >= 5)
 
     # randomize and play movie from the list
     while True:
-        idx = random.randint(0, len(arrMovies) - 1)
-        movie = arrMovies[idx]
+        movie = next_movie("rated_movie", pool)
+        if movie is None:
+            no_picks("rated movies")
+            break
         if movie is not None and not movie == "Unknown":
             show_stats_movie(movie)
 
@@ -788,14 +1498,16 @@ def play_rated_movie():
 def play_unrated_movie():
     print("\nPlay a unrated movie")
 
-    # create a list of movies with no rating
-    select = pd.to_numeric(df_lockerdb["movie_rating"]) == 0
-    arrMovies = df_lockerdb[select].index.to_list()
+    # movies with no rating
+    def pool():
+        return selection.positions(df_lockerdb, "movie_rating", 0)
 
     # randomize and play movie from the list
     while True:
-        idx = random.randint(0, len(arrMovies) - 1)
-        movie = arrMovies[idx]
+        movie = next_movie("unrated_movie", pool)
+        if movie is None:
+            no_picks("unrated movies")
+            break
         if movie is not None and not movie == "Unknown":
             show_stats_movie(movie)
 
@@ -819,20 +1531,16 @@ def play_unrated_movie():
 def play_unplayed_movie():
     print("\nPlay an unplayed movie")
 
-    # create a list of movies with playcount = 0 (never played)
-    select = pd.to_numeric(df_lockerdb["playcount"]) == 0
-    arrMovies = df_lockerdb[select].index.to_list()
-
-    # check if there are any unplayed movies
-    if len(arrMovies) == 0:
-        print("No unplayed movies found!")
-        input("Press Enter to continue...")
-        return
+    # movies with playcount = 0 (never played)
+    def pool():
+        return selection.positions(df_lockerdb, "played", False)
 
     # randomize and play movie from the list
     while True:
-        idx = random.randint(0, len(arrMovies) - 1)
-        movie = arrMovies[idx]
+        movie = next_movie("unplayed_movie", pool)
+        if movie is None:
+            no_picks("unplayed movies")
+            break
         if movie is not None and not movie == "Unknown":
             show_stats_movie(movie)
 
@@ -859,17 +1567,19 @@ def play_random_movie():
     print(df_lockerdb)
 
     while True:
-        nrows, _ = df_lockerdb.shape
         # get a random file
-        idx = random.randrange(0, nrows, 1)
+        rel_path = next_movie("random_movie", lambda: np.arange(len(df_lockerdb)))
+        if rel_path is None:
+            no_picks("movies")
+            break
 
         # print stats for the file
-        show_stats_movie(df_lockerdb.iloc[idx].name)
+        show_stats_movie(rel_path)
 
         # play the movie on user request
         choice = input("\n1. Play\t 2. Retry\t 0. Go back \nEnter your choice: ")
         if choice == "1":  # Play
-            play_movie(df_lockerdb.iloc[idx].name)
+            play_movie(rel_path)
             break
         elif choice == "2":  # Retry
             continue
@@ -884,11 +1594,11 @@ def play_random_movie():
 def play_random_actor():
     print("\nPlay a random actor")
 
-    list_actors = df_lockerdb["actor"].drop_duplicates().to_list()
-
     while True:
-        idx = random.randrange(0, len(list_actors), 1)
-        actor = list_actors[idx]
+        actor = next_actor("random_actor", lambda: np.arange(len(df_lockerdb)))
+        if actor is None:
+            no_picks("actors")
+            break
         if actor is not None and not actor == "Unknown":
             show_stats_actor(actor)
 
@@ -909,13 +1619,16 @@ def play_rated_actor():
     print("\nPlay movie for a high rated actor")
 
     # create a list of actors with at least given rating
-    select = pd.to_numeric(df_lockerdb["actor_rating"]) >= MINRATING
-    actorlist = df_lockerdb[select]["actor"].unique()
+    def pool():
+        rated = actors.where("actor_rating", lambda r: r >= MINRATING)
+        return selection.positions_in(df_lockerdb, "actor", rated)
 
     # randomize and play actor from the list
     while True:
-        idx = random.randint(0, len(actorlist) - 1)
-        actor = actorlist[idx]
+        actor = next_actor("rated_actor", pool)
+        if actor is None:
+            no_picks("rated actors")
+            break
         if actor is not None and not actor == "Unknown":
             show_stats_actor(actor)
 
@@ -939,13 +1652,16 @@ def play_unrated_actor():
     print("\nPlay movie for a unrated actor")
 
     # create a list of actors with at least given rating
-    select = pd.to_numeric(df_lockerdb["actor_rating"]) == 0
-    actorlist = df_lockerdb[select]["actor"].unique()
+    def pool():
+        unrated = actors.where("actor_rating", lambda r: r == 0)
+        return selection.positions_in(df_lockerdb, "actor", unrated)
 
     # randomize and play actor from the list
     while True:
-        idx = random.randint(0, len(actorlist) - 1)
-        actor = actorlist[idx]
+        actor = next_actor("unrated_actor", pool)
+        if actor is None:
+            no_picks("unrated actors")
+            break
         if actor is not None and not actor == "Unknown":
             show_stats_actor(actor)
 
@@ -968,7 +1684,7 @@ def play_unrated_actor():
 # Play movies for a given studio. If no studio specified, prompt for one.
 def play_studio(studio=None):
     # generate list of studios
-    arrstudio = df_lockerdb["studio"].drop_duplicates().to_list()
+    arrstudio = selection.keys(df_lockerdb, "studio")
     arrstudio.sort()
 
     # if no studio is specified, prompt for the studio name.
@@ -984,12 +1700,15 @@ def play_studio(studio=None):
         studio = arrstudio[i]
 
     # select a random movie for the studio
-    select = df_lockerdb["studio"] == studio
     while True:
-        nrows, _ = df_lockerdb[select].shape
         # get a random file
-        idx = random.randrange(0, nrows, 1)
-        rel_path = df_lockerdb[select].iloc[idx].name
+        rel_path = next_movie(
+            ("studio", studio),
+            lambda: selection.positions(df_lockerdb, "studio", studio),
+        )
+        if rel_path is None:
+            no_picks("movies")
+            break
         show_stats_movie(rel_path)
 
         # play the movie on user request
@@ -1010,31 +1729,32 @@ def play_studio(studio=None):
 # Play movies for a given studio. If no studio specified, prompt for one.
 def play_category(category=None):
     # generate list of category
-    arrcategory = df_lockerdb["category"].drop_duplicates().to_list()
+    arrcategory = selection.keys(df_lockerdb, "category")
 
     # if no category is specified, select a random category
     if category is None:
         assert len(arrcategory) != 0, "No such category found"
-        idx = random.randint(0, len(arrcategory) - 1)
-        assert 0 <= idx < len(arrcategory), "Invalid input"
-        category = arrcategory[idx]
+        category = sampler.pick(df_lockerdb, "random_category", arrcategory)
 
     print(f"\nSelected category is {category}")
 
     # select a random movie for the category
-    select = df_lockerdb["category"] == category
+    def pool():
+        return selection.positions(df_lockerdb, "category", category)
+
     while True:
-        nrows, _ = df_lockerdb[select].shape
         # get a random file
-        idx = random.randrange(0, nrows, 1)
+        rel_path = next_movie(("category", category), pool)
+        if rel_path is None:
+            no_picks("movies")
+            break
 
         # print stats for the file
-        myprint(df_lockerdb[select].iloc[idx])
+        myprint(df_lockerdb.loc[rel_path])
 
         # play the movie on user request
         choice = input("\n1. Play\t 2. Retry\t 0. Go back \nEnter your choice: ")
         if choice == "1":  # Play
-            rel_path = df_lockerdb[select].iloc[idx].name
             play_movie(rel_path)
             break
         elif choice == "2":  # Retry
@@ -1050,27 +1770,34 @@ def play_category(category=None):
 def play_random_studio():
     print("\nPlay a random studio")
 
-    list_studios = df_lockerdb["studio"].drop_duplicates().to_list()
-
     while True:
-        idx = random.randrange(0, len(list_studios), 1)
-        studio = list_studios[idx]
+        list_studios = selection.keys(df_lockerdb, "studio")
+        studio = sampler.pick(df_lockerdb, "random_studio", list_studios)
+        if studio is None:
+            no_picks("studios")
+            break
         print(f"Selected studio is: {studio}")
         play_studio(studio)
 
 
 def show_stats_actor(actorname):
     # calculate number of movies
-    select = df_lockerdb["actor"] == actorname
-    col = df_lockerdb.columns.get_loc("actor_rating")  # get column index from name
-    cnt_movies, _ = df_lockerdb[select].shape
+    positions = selection.positions(df_lockerdb, "actor", actorname)
+    cnt_movies = len(positions)
 
     # print all values
     print("Selected actor:", actorname)
-    actor_rating = df_lockerdb[select].iloc[0, col]
-    print("Actor rating:", actor_rating)
+    print("Actor rating:", actors.get(actorname, "actor_rating"))
     print("Total movies of this actor:", cnt_movies)
-    print("Movies played for this actor:", df_lockerdb[select]["playcount"].sum())
+    print("Movies played for this actor:", df_lockerdb["playcount"].iloc[positions].sum())
+    print("Last played:", format_played(events.last_played(actor=actorname)))
+    print("Plays in last 30 days:", events.plays_since(30, actor=actorname))
+
+
+def format_played(ts):
+    if ts is None:
+        return "never"
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
 
 
 def show_stats_movie(rel_path):
@@ -1078,22 +1805,16 @@ def show_stats_movie(rel_path):
     print("Selected movie:", os.path.basename(rel_path))
     print("Movie rating:", df_lockerdb.at[rel_path, "movie_rating"])
     print("Actor:", df_lockerdb.at[rel_path, "actor"])
-    print("Actor Rating:", df_lockerdb.at[rel_path, "actor_rating"])
+    actor = df_lockerdb.at[rel_path, "actor"]
+    print("Actor Rating:", actors.get(actor, "actor_rating"))
     print("Category:", df_lockerdb.at[rel_path, "category"])
     print("Studio:", df_lockerdb.at[rel_path, "studio"])
+    print("Last played:", format_played(events.last_played(rel_path)))
+    print("Plays in last 30 days:", events.plays_since(30, rel_path))
 
 
 def get_actor_rating(actorname):
-    select = df_lockerdb["actor"] == actorname
-    col = df_lockerdb.columns.get_loc("actor_rating")  # get column index from name
-    nrows, _ = df_lockerdb[select].shape
-    if nrows == 0:
-        actor_rating = 0
-    else:
-        actor_rating = df_lockerdb[select].iloc[0, col]
-        if actor_rating == "":
-            actor_rating = 0
-    return actor_rating
+    return actors.get(actorname, "actor_rating")
 
 
 def show_menu_postplay(rel_path, back=False):
@@ -1103,7 +1824,7 @@ def show_menu_postplay(rel_path, back=False):
     menu.add(MenuItem("Repeat actor", lambda: play_actor(actor)))
 
     def iupdate_stats():
-        list_fields = df_lockerdb.columns.tolist()
+        list_fields = db_columns + ["actor_category"]
         print("")
         for i, field in enumerate(list_fields):
             print(i, field)
@@ -1111,16 +1832,18 @@ def show_menu_postplay(rel_path, back=False):
 
         if list_fields[col] == "movie_rating":
             value = input("Enter value: ")
-            df_lockerdb.at[rel_path, "movie_rating"] = int(value)
+            update_movie(rel_path, "movie_rating", int(value))
+            actor = df_lockerdb.at[rel_path, "actor"]
+            events.append("movie_rating", rel_path, actor, int(value))
         elif list_fields[col] == "actor_rating":
             value = input("Enter value: ")
             actor = df_lockerdb.at[rel_path, "actor"]
-            select = df_lockerdb["actor"] == actor
-            list_select = df_lockerdb[select].index.to_list()
-            arr = []
-            for _ in range(len(list_select)):
-                arr.append(int(value))
-            df_lockerdb.loc[list_select, "actor_rating"] = arr
+            update_actor(actor, "actor_rating", int(value))
+            events.append("actor_rating", rel_path, actor, int(value))
+        elif list_fields[col] == "actor_category":
+            value = input("Enter value: ")
+            actor = df_lockerdb.at[rel_path, "actor"]
+            update_actor(actor, "actor_category", value)
         elif list_fields[col] == "studio":
             arrstudio = df_lockerdb["studio"].drop_duplicates().to_list()
             arrstudio.sort()
@@ -1133,7 +1856,7 @@ def show_menu_postplay(rel_path, back=False):
                 studio = input("Enter studio name: ")
             else:
                 studio = arrstudio[i]
-            df_lockerdb.at[rel_path, "studio"] = studio
+            update_movie(rel_path, "studio", studio)
         elif list_fields[col] == "category":
             arrcategory = df_lockerdb["category"].drop_duplicates().to_list()
             for i, category in enumerate(arrcategory):
@@ -1145,7 +1868,7 @@ def show_menu_postplay(rel_path, back=False):
                 category = input("Enter category name: ")
             else:
                 category = arrcategory[i]
-            df_lockerdb.at[rel_path, "category"] = category
+            update_movie(rel_path, "category", category)
         elif list_fields[col] == "actor":
             # Search-based actor selection
             search_term = input("Enter actor name (or part of it): ").strip()
@@ -1179,7 +1902,7 @@ def show_menu_postplay(rel_path, back=False):
                     else:
                         actor = matching_actors[choice]
             
-            df_lockerdb.at[rel_path, "actor"] = actor
+            update_movie(rel_path, "actor", actor)
         else:
             myprint(f"Cant edit field: {list_fields[col]}")
 
@@ -1204,9 +1927,9 @@ def show_menu_postplay(rel_path, back=False):
 
     menu.add(MenuItem("Delete actor", idelete_actor))
 
+    # changes are journaled as they are made, no full write needed here
     while True:
         menu.show()
-        gsheet_write()
 
 
 def show_menu_movie():
@@ -1248,14 +1971,37 @@ def show_menu_other():
     menu = Menu(show_menu_main)
     menu.add(MenuItem("Refresh database", refresh_db))
     menu.add(MenuItem("Show overall statistics", show_stats_overall))
+    menu.add(MenuItem("Show memory usage", show_memory_usage))
     menu.add(MenuItem("Copy high rated movies", copy_rated_movies))
     menu.add(MenuItem("Copy random movies", copy_random_movies))
-    # menu.add( MenuItem( "Show play history", show_play_history ) )
+    menu.add(MenuItem("Sync destination (mirror)", sync_destination))
+    menu.add(MenuItem("Verify copied movies", verify_copied_movies))
+    menu.add(MenuItem("Show play history", show_play_history))
     menu.add(MenuItem("Update studio information", update_studio))
     while True:
         menu.show()
 
 
+def show_play_history():
+    # newest first, ratings and deletions are shown between the plays
+    rows = events.history(limit=30)
+    if len(rows) == 0:
+        print("No play history yet")
+        return
+    print("")
+    for ts, kind, rel_path, actor, value in rows:
+        name = os.path.basename(rel_path.replace("\\", "/")) if rel_path else ""
+        if kind == "play":
+            print(f"{format_played(ts)}  played        {name} ({actor})")
+        elif kind == "movie_rating":
+            print(f"{format_played(ts)}  rated movie   {name}: {value}")
+        elif kind == "actor_rating":
+            print(f"{format_played(ts)}  rated actor   {actor}: {value}")
+        elif kind == "delete":
+            print(f"{format_played(ts)}  deleted       {name} ({actor})")
+    print(f"\nPlays in last 30 days: {events.plays_since(30)}")
+
+
 def show_stats_overall():
     # movie statistics
     cnt_movies, _ = df_lockerdb.shape
@@ -1267,7 +2013,8 @@ def show_stats_overall():
     s_all_actors = df_lockerdb.actor.unique()
     s_played_actors = df_lockerdb[df_lockerdb.playcount > 0].actor.unique()
     cnt_actors = s_all_actors.size
-    cnt_actor_hi_rated = df_lockerdb[df_lockerdb.actor_rating > 4].actor.unique().size
+    hi_rated = actors.where("actor_rating", lambda r: r > 4)
+    cnt_actor_hi_rated = len(set(hi_rated).intersection(s_all_actors))
     cnt_actor_unplayed = s_all_actors.size - s_played_actors.size
     # compute unplayed actor
 
@@ -1297,6 +2044,33 @@ def show_stats_overall():
     print("Number of hi rated actors: ", cnt_actor_hi_rated)
     print("Number of unplayed actors: ", cnt_actor_unplayed)
 
+    # Persistence stats
+    if writer is not None and writer.writes > 0:
+        print("---Persistence stats---")
+        print("Pending database writes: ", writer.queue_depth)
+        print(f"Last database write took: {writer.last_duration * 1000:.0f} ms")
+
+
+def show_memory_usage():
+    # bytes per column with object strings and 64 bit numbers (as loaded)
+    # against the compact dtypes the database is kept in
+    kb = 1024
+    total_before, total_after = 0, 0
+    print(f"\n{'Column':<14}{'Loaded':>12}{'Compact':>12}  Type")
+    for col, before, after in memory_report(df_lockerdb):
+        dtype = df_lockerdb.index.dtype if col == "rel_path" else df_lockerdb[col].dtype
+        print(f"{col:<14}{before / kb:>9.0f} KB{after / kb:>9.0f} KB  {dtype}")
+        total_before += before
+        total_after += after
+    # actor_rating was loaded as one number per movie, it is one per actor
+    # in the actor table now
+    before = len(df_lockerdb) * 8
+    after = int(actors.df.memory_usage(deep=True).sum())
+    print(f"{'actor table':<14}{before / kb:>9.0f} KB{after / kb:>9.0f} KB  {len(actors.df)} actors")
+    total_before += before
+    total_after += after
+    print(f"{'Total':<14}{total_before / kb:>9.0f} KB{total_after / kb:>9.0f} KB")
+
 
 def show_menu_main():
     menu = Menu()
@@ -1316,12 +2090,29 @@ def update_studio():
     print("Updating studio information")
     s_studio = df_lockerdb.index.map(lambda x: x.split("\\")[0])
     df_lockerdb["studio"] = s_studio
+    compact(df_lockerdb)
+    selection.invalidate()
     gsheet_write()
 
 
 def main():
     gsheet_init()
-    show_menu_main()
+    startup_timer.mark("load")
+    show_stats_overall()
+    startup_timer.mark("stats")
+    if config["DEFAULT"].get("WATCH", "0") == "1":
+        watch_start()
+
+    # time to first menu
+    print(f"\nStartup time: {startup_timer.report()}")
+    budget = float(config["DEFAULT"].get("STARTUP_BUDGET", "2.0"))
+    if startup_timer.total() > budget:
+        print(f"WARNING: Startup took longer than the budget of {budget:.1f} s")
+
+    try:
+        show_menu_main()
+    finally:
+        gsheet_close()
 
 
 if __name__ == "__main__":
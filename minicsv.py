@@ -0,0 +1,140 @@
+# import standard packages
+import os
+import csv
+import time
+import threading
+
+ACTOR_STATS_COLUMNS = ["actor", "actor_rating", "actor_category"]
+
+
+def _csv_value(value):
+    # same rendering as DataFrame.to_csv: missing values become empty
+    if value is None:
+        return ""
+    if isinstance(value, float) and value != value:
+        return ""
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _read_header(path):
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), None)
+
+
+class MiniCsvWriter:
+    """Streaming append writer for LockerDB_mini.csv and actor_stats.csv.
+
+    Both files stay open in append mode. Rows are buffered and written when
+    batch_rows rows are pending or flush_interval seconds have passed,
+    close() writes the rest and fsyncs. Existing files keep their header,
+    new rows follow its column order, so play_rpi.sh keeps parsing them.
+    """
+
+    def __init__(
+        self,
+        csv_path,
+        movie_columns,
+        actor_stats_path,
+        known_actors,
+        batch_rows=50,
+        flush_interval=5.0,
+    ):
+        self.lock = threading.Lock()
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+        self.known_actors = set(known_actors)
+        self.movie_rows = []
+        self.actor_rows = []
+        self.movie_count = 0
+        self.actor_count = 0
+        self.movie_f, self.movie_columns = self._open(csv_path, movie_columns)
+        self.actor_f, self.actor_columns = self._open(
+            actor_stats_path, ACTOR_STATS_COLUMNS
+        )
+        self.movie_csv = csv.writer(self.movie_f, lineterminator=os.linesep)
+        self.actor_csv = csv.writer(self.actor_f, lineterminator=os.linesep)
+
+    def _open(self, path, columns):
+        # reuse the header of an existing file, write one for a new file
+        header = None
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            header = _read_header(path)
+        f = open(path, "a", newline="", encoding="utf-8")
+        if header is None:
+            header = columns
+            csv.writer(f, lineterminator=os.linesep).writerow(header)
+        return f, header
+
+    def add(self, movie_row, actor_name, actor_rating, actor_category=""):
+        """Queue one copied movie, and its actor if the actor is new"""
+        with self.lock:
+            self.movie_rows.append(
+                [_csv_value(movie_row.get(col)) for col in self.movie_columns]
+            )
+            if actor_name and actor_name not in self.known_actors:
+                self.known_actors.add(actor_name)
+                actor_row = {
+                    "actor": actor_name,
+                    "actor_rating": actor_rating,
+                    "actor_category": actor_category,
+                }
+                self.actor_rows.append(
+                    [_csv_value(actor_row.get(col)) for col in self.actor_columns]
+                )
+            pending = len(self.movie_rows) + len(self.actor_rows)
+            if (
+                pending >= self.batch_rows
+                or time.monotonic() - self.last_flush >= self.flush_interval
+            ):
+                self._flush()
+
+    def _flush(self):
+        # caller holds the lock
+        self.actor_csv.writerows(self.actor_rows)
+        self.movie_csv.writerows(self.movie_rows)
+        self.actor_f.flush()
+        self.movie_f.flush()
+        self.actor_count += len(self.actor_rows)
+        self.movie_count += len(self.movie_rows)
+        self.actor_rows = []
+        self.movie_rows = []
+        self.last_flush = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            for f in [self.actor_f, self.movie_f]:
+                os.fsync(f.fileno())
+                f.close()
+
+
+def drop_rows(csv_path, rel_paths):
+    """Rewrite a mini CSV file without the rows of rel_paths (first column)"""
+    rel_paths = set(rel_paths)
+    if len(rel_paths) == 0 or not os.path.exists(csv_path):
+        return 0
+    dropped = 0
+    tmp_path = csv_path + ".tmp"
+    with open(csv_path, "r", newline="", encoding="utf-8") as src:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst, lineterminator=os.linesep)
+            header = next(reader, None)
+            if header is not None:
+                writer.writerow(header)
+            for row in reader:
+                if len(row) > 0 and row[0] in rel_paths:
+                    dropped += 1
+                    continue
+                writer.writerow(row)
+            dst.flush()
+            os.fsync(dst.fileno())
+    os.replace(tmp_path, csv_path)
+    return dropped
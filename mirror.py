@@ -0,0 +1,51 @@
+# import standard packages
+from collections import namedtuple
+
+# import external packages
+import numpy as np
+from planner import plan_fill
+
+# copy: [(rel_path, size)] to copy, evict: [(rel_path, size)] to remove,
+# keep: number of movies staying, stale: mini CSV rows without a file
+MirrorPlan = namedtuple("MirrorPlan", ["copy", "evict", "keep", "stale"])
+
+
+def plan_mirror(candidates, sizes, present, capacity, order=None, margin=0, stale=()):
+    """Decide what a destination should hold and how to get there.
+
+    candidates are the database keys of the desired set with their sizes,
+    present maps the keys of the movies the destination holds (according
+    to its mini CSV) to their sizes. The desired set is cut down to what
+    fits into capacity, the free space plus what the present movies use.
+    Movies which are present and still desired are kept, the rest of the
+    present ones are evicted. stale rows are passed through for the
+    summary.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    chosen = plan_fill(sizes, capacity, order, margin)
+    wanted = set()
+    copy = []
+    for i in chosen.tolist():
+        rel_path = candidates[i]
+        wanted.add(rel_path)
+        if rel_path not in present:
+            copy.append((rel_path, int(sizes[i])))
+    evict = [
+        (rel_path, size) for rel_path, size in present.items() if rel_path not in wanted
+    ]
+    return MirrorPlan(copy, evict, len(present) - len(evict), list(stale))
+
+
+def describe_plan(plan):
+    """Lines of the dry-run summary of a mirror plan"""
+    bytes_add = sum(size for _, size in plan.copy)
+    bytes_free = sum(size for _, size in plan.evict)
+    gb = 1024 * 1024 * 1024
+    lines = [
+        f"Keep:  {plan.keep} movies",
+        f"Copy:  {len(plan.copy)} movies, {bytes_add / gb:.2f} GB to add",
+        f"Evict: {len(plan.evict)} movies, {bytes_free / gb:.2f} GB to free",
+    ]
+    if len(plan.stale) > 0:
+        lines.append(f"Stale: {len(plan.stale)} mini CSV rows without a file")
+    return lines
@@ -0,0 +1,107 @@
+# import external packages
+import numpy as np
+import pandas as pd
+
+UNPLAYED_WEIGHT = 4.0  # an unplayed movie counts this many times a played one
+WEIGHT_MODES = ["none", "movie_rating", "actor_rating", "unplayed"]
+
+
+def copy_weights(df, mode):
+    """Selection weight of every row of df, all ones for mode "none" """
+    if mode in ["movie_rating", "actor_rating"]:
+        rating = pd.to_numeric(df[mode], errors="coerce").fillna(0).clip(lower=0)
+        return 1.0 + rating.to_numpy(dtype=float)
+    if mode == "unplayed":
+        playcount = pd.to_numeric(df["playcount"], errors="coerce").fillna(0)
+        return np.where(playcount.to_numpy() == 0, UNPLAYED_WEIGHT, 1.0)
+    return np.ones(len(df))
+
+
+def weighted_keys(weights, rng):
+    """Sort keys u ** (1 / weight) for a uniform u (Efraimidis-Spirakis).
+
+    Taking items by descending key is a weighted random order, equal
+    weights give a plain shuffle.
+    """
+    weights = np.maximum(np.asarray(weights, dtype=float), 1e-9)
+    return rng.random(len(weights)) ** (1.0 / weights)
+
+
+def weighted_order(weights, rng=None):
+    """Random permutation in which heavier items tend to come first"""
+    if rng is None:
+        rng = np.random.default_rng()
+    return np.argsort(-weighted_keys(weights, rng), kind="stable")
+
+
+def plan_fill(sizes, capacity, order=None, margin=0, max_rounds=256):
+    """Choose items whose total size fills capacity as far as possible.
+
+    A greedy pass takes the items in `order` (default: as given) and,
+    unlike a plain cumulative cut, keeps going past items that do not
+    fit. While more than `margin` bytes stay free, single swaps of a
+    chosen item for a larger unchosen one (or plain additions) close the
+    gap, each round takes the swap which gains the most.
+
+    Returns the indices of the chosen items, in order of preference.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    if order is None:
+        order = np.arange(len(sizes))
+    order = np.asarray(order)
+
+    chosen = []
+    free = int(capacity)
+    smallest = int(sizes.min()) if len(sizes) > 0 else 0
+    for i, size in zip(order.tolist(), sizes[order].tolist()):
+        if size <= free:
+            chosen.append(i)
+            free -= size
+            if free < smallest:
+                break
+    if free <= margin or len(chosen) == len(sizes):
+        return np.array(chosen, dtype=np.int64)
+
+    # unchosen items sorted by size, for searchsorted lookups
+    taken = np.zeros(len(sizes), dtype=bool)
+    taken[chosen] = True
+    rest = np.flatnonzero(~taken)
+    rest = rest[np.argsort(sizes[rest], kind="stable")]
+    rest_sizes = sizes[rest]
+    chosen = np.array(chosen, dtype=np.int64)
+    chosen_sizes = sizes[chosen]
+
+    for _ in range(max_rounds):
+        if free <= margin or len(rest) == 0:
+            break
+        # best addition: the largest unchosen item that fits
+        add_pos = np.searchsorted(rest_sizes, free, side="right") - 1
+        add_gain = rest_sizes[add_pos] if add_pos >= 0 else 0
+        # best swap: chosen item s out, the largest unchosen u <= s + free in
+        swap_gain = 0
+        if len(chosen) > 0:
+            pos = np.searchsorted(rest_sizes, chosen_sizes + free, side="right") - 1
+            gains = np.where(pos >= 0, rest_sizes[np.maximum(pos, 0)] - chosen_sizes, 0)
+            out = int(np.argmax(gains))
+            swap_gain = gains[out]
+        if max(add_gain, swap_gain) <= 0:
+            break
+
+        if add_gain >= swap_gain:
+            chosen = np.append(chosen, rest[add_pos])
+            chosen_sizes = np.append(chosen_sizes, rest_sizes[add_pos])
+            rest = np.delete(rest, add_pos)
+            rest_sizes = np.delete(rest_sizes, add_pos)
+            free -= int(add_gain)
+        else:
+            swap_pos = pos[out]
+            new_item, new_size = rest[swap_pos], rest_sizes[swap_pos]
+            old_item, old_size = chosen[out], chosen_sizes[out]
+            chosen[out], chosen_sizes[out] = new_item, new_size
+            rest = np.delete(rest, swap_pos)
+            rest_sizes = np.delete(rest_sizes, swap_pos)
+            insert = np.searchsorted(rest_sizes, old_size)
+            rest = np.insert(rest, insert, old_item)
+            rest_sizes = np.insert(rest_sizes, insert, old_size)
+            free -= int(swap_gain)
+    return chosen
@@ -0,0 +1,193 @@
+# import standard packages
+import time
+
+# import external packages
+import numpy as np
+import pandas as pd
+from planner import weighted_keys
+
+# factors of the pick weight, the exponent of each comes from PICK_WEIGHTS
+WEIGHT_FACTORS = ["movie_rating", "actor_rating", "playcount", "recency"]
+RECENCY_DAYS = 30.0  # a movie played this long ago is ~63% back in the pool
+BATCH_SIZE = 64  # draws served per partition of the keys
+
+
+def parse_weights(text):
+    """Exponents from a string like "movie_rating=1, playcount=0.5".
+
+    Factors which are not mentioned get 0, i.e. do not matter. Raises
+    ValueError on unknown factors or values which are not numbers.
+    """
+    exponents = dict.fromkeys(WEIGHT_FACTORS, 0.0)
+    for part in text.split(","):
+        if part.strip() == "":
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in exponents:
+            raise ValueError(f"Unknown weight factor {name}")
+        exponents[name] = float(value)
+    return exponents
+
+
+class ShuffleBag:
+    """Weighted random order over items, drawn without repetition.
+
+    Draws take the items by descending weighted_keys(), like the copy
+    planner orders its candidates. Instead of sorting all keys up front,
+    the next BATCH_SIZE are picked with one O(n) partition, so filling and
+    drawing both stay cheap on large pools. drawn items (of an earlier bag
+    over a changed pool) are left out.
+    """
+
+    def __init__(self, items, weights, rng, drawn=()):
+        self.items = np.asarray(items)
+        self.keys = weighted_keys(weights, rng)
+        self.drawn = list(drawn)
+        if len(self.drawn) > 0:
+            self.keys[np.isin(self.items, self.drawn)] = -1.0
+        self.left = int(np.count_nonzero(self.keys >= 0))
+        self.batch = []
+
+    def __len__(self):
+        return self.left
+
+    def draw(self):
+        if self.left == 0:
+            return None
+        if len(self.batch) == 0:
+            k = min(BATCH_SIZE, self.left)
+            top = np.argpartition(-self.keys, k - 1)[:k]
+            # reversed, so that pop() returns the largest key first
+            self.batch = top[np.argsort(self.keys[top])].tolist()
+        i = self.batch.pop()
+        self.keys[i] = -1.0
+        self.left -= 1
+        item = self.items[i]
+        self.drawn.append(item)
+        return item
+
+
+class Sampler:
+    """Weighted random picks for the play menus, one shuffle bag per mode.
+
+    A mode (e.g. ("studio", name) or "rated_movie") keeps its bag across
+    Retry and across visits of the menu, so nothing repeats before the
+    whole pool was offered once. When the pool of a mode changes (a movie
+    got rated, the studio got a new movie), the bag is refilled from the
+    new pool without the items drawn already. Changes of the rows of the
+    frame (drop, concat) are noticed by identity and reset all bags.
+
+    Weights are taken when a bag is filled. They are the product of
+    (1 + movie_rating) ** a, (1 + actor_rating) ** b, (1 + playcount) ** -c
+    and (1 - exp(-days since last play / recency_days)) ** d, with the
+    exponents from parse_weights(). All zero gives a plain shuffle.
+    """
+
+    def __init__(self, exponents=None, recency_days=RECENCY_DAYS, rng=None):
+        self.exponents = exponents or dict.fromkeys(WEIGHT_FACTORS, 0.0)
+        self.recency_days = recency_days
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.df = None
+        self.bags = {}  # mode -> (source, bag)
+        self.last_played = {}  # rel_path -> unix time
+        self.recency = None  # (df, time of the last play per row)
+        self.actors = None  # actor table, for the actor_rating factor
+
+    def played(self, rel_path, when=None):
+        """Record a play, for the recency factor"""
+        when = time.time() if when is None else when
+        self.last_played[rel_path] = when
+        if self.recency is not None:
+            df, last = self.recency
+            pos = df.index.get_indexer([rel_path])[0]
+            if pos >= 0:
+                last[pos] = when
+
+    def _seconds_since_play(self, df):
+        # per row, NaN for rows never played (as far as we know)
+        if self.recency is None or self.recency[0] is not df:
+            last = np.full(len(df), np.nan)
+            if len(self.last_played) > 0:
+                pos = df.index.get_indexer(list(self.last_played))
+                when = np.fromiter(self.last_played.values(), dtype=float)
+                last[pos[pos >= 0]] = when[pos >= 0]
+            self.recency = (df, last)
+        return time.time() - self.recency[1]
+
+    def weights(self, df, positions):
+        """Pick weight of the rows at positions, in one pass per factor"""
+        w = np.ones(len(positions))
+        for col in ["movie_rating", "actor_rating"]:
+            if self.exponents[col] != 0:
+                if col in df.columns:
+                    rating = df[col].to_numpy()[positions]
+                else:
+                    rating = self.actors.per_row(df, col, positions)
+                rating = np.clip(np.nan_to_num(rating.astype(float)), 0, None)
+                w *= (1.0 + rating) ** self.exponents[col]
+        if self.exponents["playcount"] != 0:
+            playcount = df["playcount"].to_numpy()[positions].astype(float)
+            playcount = np.clip(np.nan_to_num(playcount), 0, None)
+            w *= (1.0 + playcount) ** -self.exponents["playcount"]
+        if self.exponents["recency"] != 0:
+            days = self._seconds_since_play(df)[positions] / 86400.0
+            factor = -np.expm1(-np.maximum(days, 0) / self.recency_days)
+            w *= np.where(np.isnan(days), 1.0, factor) ** self.exponents["recency"]
+        return w
+
+    def _bag(self, df, mode, source, fill):
+        if self.df is not df:
+            self.df = df
+            self.bags = {}
+        drawn = ()
+        entry = self.bags.get(mode)
+        if entry is not None:
+            old_source, bag = entry
+            same = old_source is source or (
+                len(old_source) == len(source) and np.array_equal(old_source, source)
+            )
+            if same and len(bag) > 0:
+                self.bags[mode] = (source, bag)
+                return bag
+            if not same:
+                drawn = bag.drawn
+        items, weights = fill()
+        bag = ShuffleBag(items, weights, self.rng, drawn)
+        if len(bag) == 0:
+            # the whole pool was offered, start the next round
+            bag = ShuffleBag(items, weights, self.rng)
+        self.bags[mode] = (source, bag)
+        return bag
+
+    def pick_movie(self, df, mode, positions):
+        """Row position of the next movie of a mode, None for an empty pool"""
+        if len(positions) == 0:
+            return None
+        bag = self._bag(
+            df, mode, positions, lambda: (positions, self.weights(df, positions))
+        )
+        return int(bag.draw())
+
+    def pick_actor(self, df, mode, positions):
+        """Next actor among the movies at positions, weighted by the mean
+        weight of their movies"""
+        if len(positions) == 0:
+            return None
+
+        def fill():
+            codes, actors = pd.factorize(df["actor"].to_numpy()[positions])
+            known = codes >= 0  # rows without an actor are left out
+            weights = self.weights(df, positions)[known]
+            counts = np.bincount(codes[known], minlength=len(actors))
+            total = np.bincount(codes[known], weights, len(actors))
+            return np.asarray(actors, dtype=object), total / counts
+
+        return self._bag(df, mode, positions, fill).draw()
+
+    def pick(self, df, mode, items):
+        """Next of a list of plain choices (studios, categories), unweighted"""
+        if len(items) == 0:
+            return None
+        items = np.asarray(items, dtype=object)
+        return self._bag(df, mode, items, lambda: (items, np.ones(len(items)))).draw()
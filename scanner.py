@@ -0,0 +1,295 @@
+# import standard packages
+import os
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+
+# one file found under the movie folder. rel_path is in database key format,
+# path is the full filesystem path
+FileEntry = namedtuple(
+    "FileEntry", "rel_path path actor studio ext size mtime inode bad_name"
+)
+
+# what the manifest remembers about one folder: its mtime (ns), the
+# FileEntry of every file in it and the names of its subfolders
+DirRecord = namedtuple("DirRecord", "mtime files subdirs")
+
+
+def to_db_path(rel_path):
+    """Database keys always use windows separators, whatever the platform"""
+    return rel_path.replace(os.sep, "\\").replace("/", "\\")
+
+
+def split_db_path(rel_path):
+    """Return (studio, actor) of a database key.
+
+    The studio is the first folder, the actor the second one. The actor is
+    None for files sitting directly in the movie folder.
+    """
+    parts = rel_path.split("\\")
+    actor = parts[1] if len(parts) > 1 else None
+    return parts[0], actor
+
+
+def diff_paths(db_paths, disk_paths):
+    """Compare the database with the filesystem using set operations.
+
+    Returns (added, removed): files on disk missing from the database, and
+    database entries missing on disk. Both keep the order of their input.
+    """
+    db_set = set(db_paths)
+    disk_set = set(disk_paths)
+    added = [rel_path for rel_path in disk_paths if rel_path not in db_set]
+    removed = [rel_path for rel_path in db_paths if rel_path not in disk_set]
+    return added, removed
+
+
+def _stat_folder(root, folder, names, want_size):
+    # list one folder and look up the requested names in it
+    path = os.path.join(root, *folder.split("\\")) if folder else root
+    found = {}
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                found[entry.name] = entry
+    except OSError:
+        pass
+    exists = []
+    sizes = []
+    for name in names:
+        entry = found.get(name)
+        ok = entry is not None and entry.is_file()
+        size = -1
+        if ok and want_size:
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                ok = False
+        exists.append(ok)
+        sizes.append(size)
+    return exists, sizes
+
+
+def stat_paths(root, rel_paths, max_workers=4, want_size=False):
+    """Look up many database keys under root at once.
+
+    Keys are grouped by parent folder, every folder is listed only once
+    with scandir and folders are handled concurrently on a bounded thread
+    pool. Returns (exists, size) numpy arrays aligned with rel_paths, size
+    is -1 for missing files or when want_size is False.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    keys = pd.Series(list(rel_paths), dtype=object)
+    exists = np.zeros(len(keys), dtype=bool)
+    sizes = np.full(len(keys), -1, dtype=np.int64)
+    if len(keys) == 0:
+        return exists, sizes
+    parts = keys.str.rpartition("\\")
+    groups = parts[2].groupby(parts[0], sort=False)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (
+                positions.index.to_numpy(),
+                executor.submit(
+                    _stat_folder, root, folder, positions.tolist(), want_size
+                ),
+            )
+            for folder, positions in groups
+        ]
+        for index, future in futures:
+            found, found_sizes = future.result()
+            exists[index] = found
+            sizes[index] = found_sizes
+    return exists, sizes
+
+
+def missing_mask(rel_paths, root, max_workers=4):
+    """Boolean mask over rel_paths, True where the file does not exist"""
+    exists, _ = stat_paths(root, rel_paths, max_workers)
+    return ~exists
+
+
+def is_bad_name(name):
+    # names which are not valid unicode come back with surrogate escapes
+    try:
+        name.encode("utf-8")
+        return False
+    except UnicodeEncodeError:
+        return True
+
+
+class Inventory:
+    """Everything one scan of the movie folder found"""
+
+    def __init__(self, root):
+        self.root = root
+        self.files = []  # FileEntry for every file
+        self.empty_dirs = []  # full paths of empty folders
+        self.bad_dirs = []  # folders holding files with invalid names
+        self.errors = []  # (path, error) for folders which could not be read
+        self.dirs = {}  # DirRecord per folder, saved as the next manifest
+        self.listed = 0  # folders read from disk
+        self.reused = 0  # unchanged folders taken from the manifest
+
+    def rel_paths(self):
+        return [entry.rel_path for entry in self.files]
+
+    def unread_prefixes(self):
+        """Database key prefixes of the folders which could not be read.
+
+        Files below them are unknown, not missing. "" (everything) when
+        the movie folder itself could not be read.
+        """
+        prefixes = []
+        for path, _ in self.errors:
+            rel_path = os.path.relpath(path, self.root)
+            if rel_path == os.curdir:
+                return [""]
+            prefixes.append(to_db_path(rel_path) + "\\")
+        return prefixes
+
+    def discard(self, rel_paths):
+        """Forget files which were removed after the scan"""
+        rel_paths = set(rel_paths)
+        self.files = [entry for entry in self.files if entry.rel_path not in rel_paths]
+
+    def merge(self, other):
+        self.files.extend(other.files)
+        self.empty_dirs.extend(other.empty_dirs)
+        self.bad_dirs.extend(other.bad_dirs)
+        self.errors.extend(other.errors)
+        self.dirs.update(other.dirs)
+        self.listed += other.listed
+        self.reused += other.reused
+
+
+def _file_entry(entry, parts):
+    try:
+        st = entry.stat(follow_symlinks=False)
+        size, mtime, inode = st.st_size, st.st_mtime, st.st_ino
+    except OSError:
+        size, mtime, inode = None, None, None
+    rel_path = "\\".join(parts)
+    studio, actor = split_db_path(rel_path)
+    ext = os.path.splitext(entry.name)[1]
+    bad_name = any(is_bad_name(part) for part in parts)
+    return FileEntry(
+        rel_path, entry.path, actor, studio, ext, size, mtime, inode, bad_name
+    )
+
+
+def _scan_folder(inventory, folder, parts, old_dirs):
+    # read one folder, or take it from the manifest when its mtime did not
+    # change. Returns the DirRecord, or None when the folder is unreadable
+    try:
+        mtime = os.stat(folder).st_mtime_ns
+    except OSError as e:
+        inventory.errors.append((folder, e))
+        return None
+    cached = old_dirs.get(folder)
+    if cached is not None and cached.mtime == mtime:
+        inventory.reused += 1
+        record = cached
+    else:
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError as e:
+                        inventory.errors.append((entry.path, e))
+                        continue
+                    if is_dir:
+                        subdirs.append(entry.name)
+                    else:
+                        files.append(_file_entry(entry, parts + [entry.name]))
+        except OSError as e:
+            inventory.errors.append((folder, e))
+            return None
+        inventory.listed += 1
+        record = DirRecord(mtime, files, subdirs)
+
+    inventory.dirs[folder] = record
+    inventory.files.extend(record.files)
+    if len(record.files) + len(record.subdirs) == 0:
+        inventory.empty_dirs.append(folder)
+    if any(file_entry.bad_name for file_entry in record.files):
+        inventory.bad_dirs.append(folder)
+    return record
+
+
+def _scan_tree(root, top, parts, old_dirs):
+    # walk one subtree, collecting into a private inventory
+    inventory = Inventory(root)
+    stack = [(top, parts)]
+    while len(stack) > 0:
+        folder, folder_parts = stack.pop()
+        record = _scan_folder(inventory, folder, folder_parts, old_dirs)
+        if record is None:
+            continue
+        for name in record.subdirs:
+            stack.append((os.path.join(folder, name), folder_parts + [name]))
+    return inventory
+
+
+def scan(root, max_workers=4, manifest=None):
+    """Scan the movie folder in a single pass.
+
+    Every top level (studio) folder is scanned on its own thread, the
+    results are merged into one Inventory. With a manifest from an earlier
+    scan, folders whose mtime did not change are not listed again and
+    their files are not stat-ed again; every folder still gets one stat
+    to notice changes further down. Files modified in place (same name)
+    do not change their folder's mtime and keep their old size and mtime.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    old_dirs = {}
+    if manifest is not None and manifest.get("root") == root:
+        old_dirs = manifest["dirs"]
+
+    inventory = Inventory(root)
+    record = _scan_folder(inventory, root, [], old_dirs)
+    if record is None:
+        return inventory
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _scan_tree, root, os.path.join(root, name), [name], old_dirs
+            )
+            for name in record.subdirs
+        ]
+        for future in futures:
+            inventory.merge(future.result())
+    return inventory
+
+
+def load_manifest(path):
+    """Manifest saved by an earlier scan, None if there is none"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Warning: Could not read scan manifest: {e}")
+        return None
+
+
+def save_manifest(path, inventory):
+    manifest = {"root": inventory.root, "dirs": inventory.dirs}
+    # the watch thread may save at the same time as a refresh
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(manifest, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"Warning: Could not write scan manifest: {e}")
@@ -0,0 +1,93 @@
+# import external packages
+import numpy as np
+import pandas as pd
+
+# repeated strings are stored once per distinct value
+CATEGORY_COLUMNS = ["actor", "studio", "category", "actor_category"]
+# small counters, 0 means unrated / unplayed
+INTEGER_COLUMNS = {
+    "movie_rating": np.int8,
+    "actor_rating": np.int8,
+    "playcount": np.int16,
+}
+
+
+def _compact_integer(s, dtype):
+    # missing values count as 0, like everywhere else in the program.
+    # Fractional ratings or values out of range keep a float column
+    values = pd.to_numeric(s, errors="coerce").fillna(0)
+    info = np.iinfo(dtype)
+    if (values % 1 != 0).any() or values.min() < info.min or values.max() > info.max:
+        return values.astype(np.float32)
+    return values.astype(dtype)
+
+
+def compact(df):
+    """Convert the columns of df to their compact dtypes, in place.
+
+    Columns which have the compact dtype already are left alone, so this
+    is cheap to call again after a concat() turned some back into objects.
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    for col, dtype in INTEGER_COLUMNS.items():
+        if col in df.columns and df[col].dtype not in [dtype, np.float32]:
+            df[col] = _compact_integer(df[col], dtype)
+    return df
+
+
+def allow_value(df, col, value):
+    """Make value assignable to column col.
+
+    New categories are added. A compact integer column becomes float32
+    (like in compact()) when value is fractional or out of its range.
+    """
+    s = df[col]
+    if pd.isna(value):
+        return
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        if value not in s.cat.categories:
+            df[col] = s.cat.add_categories([value])
+    elif pd.api.types.is_integer_dtype(s.dtype):
+        number = pd.to_numeric(value, errors="coerce")
+        info = np.iinfo(s.dtype)
+        if pd.isna(number):
+            return
+        if number % 1 != 0 or number < info.min or number > info.max:
+            df[col] = s.astype(np.float32)
+
+
+def export_frame(df):
+    """Copy of df with plain string cells, as written to the workbook"""
+    out = df.copy()
+    for col in out.columns:
+        if isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(object)
+        elif col in INTEGER_COLUMNS:
+            out[col] = out[col].map(lambda x: str(x))
+    out = out.fillna("")
+    return out.reset_index(names="rel_path")
+
+
+def widen(df):
+    """Copy of df with object strings and 64 bit numbers, as loaded"""
+    out = df.copy()
+    for col in out.columns:
+        if isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(object)
+        elif pd.api.types.is_integer_dtype(out[col].dtype):
+            out[col] = out[col].astype(np.int64)
+        elif pd.api.types.is_float_dtype(out[col].dtype):
+            out[col] = out[col].astype(np.float64)
+    return out
+
+
+def memory_report(df):
+    """[(column, bytes as loaded, bytes compact)], the index first"""
+    before = widen(df).memory_usage(deep=True)
+    after = df.memory_usage(deep=True)
+    return [
+        ("rel_path" if col == "Index" else col, int(before[col]), int(after[col]))
+        for col in after.index
+    ]
@@ -0,0 +1,120 @@
+# import external packages
+import numpy as np
+import pandas as pd
+
+# column of every dimension, "played" is derived from playcount
+DIMENSIONS = {
+    "actor": "actor",
+    "studio": "studio",
+    "category": "category",
+    "movie_rating": "movie_rating",
+    "played": "playcount",
+}
+RATING_DIMENSIONS = ["movie_rating"]
+
+
+def _key(dim, value):
+    # one key per bucket: missing values (NaN, None, "") share the bucket
+    # None, ratings are numbers and "played" is a bool
+    if dim == "played":
+        value = pd.to_numeric(value, errors="coerce")
+        return bool(value > 0) if pd.notna(value) else False
+    if value is None or value == "" or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if dim in RATING_DIMENSIONS:
+        value = pd.to_numeric(value, errors="coerce")
+        return None if pd.isna(value) else float(value)
+    return value
+
+
+class SelectionIndex:
+    """Row positions of df_lockerdb per actor, studio, category, rating and
+    played status.
+
+    Lookups return numpy arrays of row positions, so a random pick is one
+    array access instead of filtering the frame. Changes of single values
+    (update()) move positions between buckets. Frames with other rows are
+    noticed by identity, drop() and concat() return a new frame, and the
+    index is rebuilt on the next lookup. Changes of whole columns in place
+    need invalidate().
+    """
+
+    def __init__(self):
+        self.df = None
+        self.buckets = {}  # dim -> {key: positions}
+
+    def invalidate(self):
+        self.df = None
+
+    def _rebuild(self, df):
+        self.buckets = {}
+        for dim, col in DIMENSIONS.items():
+            buckets = {}
+            if col in df.columns:
+                codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+                order = np.argsort(codes, kind="stable")
+                bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+                for code, value in enumerate(uniques):
+                    positions = order[bounds[code] : bounds[code + 1]]
+                    key = _key(dim, value)
+                    if key in buckets:
+                        positions = np.sort(np.concatenate([buckets[key], positions]))
+                    buckets[key] = positions
+            self.buckets[dim] = buckets
+        self.df = df
+
+    def _buckets(self, df, dim):
+        if self.df is not df:
+            self._rebuild(df)
+        return self.buckets[dim]
+
+    def keys(self, df, dim):
+        """Distinct values of a dimension, without the missing value"""
+        return [key for key in self._buckets(df, dim) if key is not None]
+
+    def positions(self, df, dim, key):
+        """Row positions where dimension dim has the value key"""
+        return self._buckets(df, dim).get(_key(dim, key), np.empty(0, dtype=np.intp))
+
+    def positions_where(self, df, dim, predicate):
+        """Row positions of all buckets whose key satisfies predicate"""
+        parts = [
+            positions
+            for key, positions in self._buckets(df, dim).items()
+            if key is not None and predicate(key)
+        ]
+        if len(parts) == 0:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(parts)
+
+    def positions_in(self, df, dim, keys):
+        """Row positions where dimension dim has one of keys"""
+        buckets = self._buckets(df, dim)
+        parts = [buckets[_key(dim, key)] for key in keys if _key(dim, key) in buckets]
+        if len(parts) == 0:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(parts)
+
+    def update(self, df, positions, col, old_values, value):
+        """Move rows whose column col changed from old_values to value"""
+        if self.df is not df:
+            # rebuilt from the current values on the next lookup anyway
+            return
+        new_values = [value] * len(positions)
+        for dim, dim_col in DIMENSIONS.items():
+            if dim_col != col:
+                continue
+            buckets = self.buckets[dim]
+            for pos, old, new in zip(positions, old_values, new_values):
+                old_key, new_key = _key(dim, old), _key(dim, new)
+                if old_key == new_key:
+                    continue
+                bucket = buckets.get(old_key)
+                if bucket is not None:
+                    bucket = bucket[bucket != pos]
+                    if len(bucket) == 0:
+                        del buckets[old_key]
+                    else:
+                        buckets[old_key] = bucket
+                bucket = buckets.get(new_key, np.empty(0, dtype=np.intp))
+                buckets[new_key] = np.append(bucket, pos)
@@ -0,0 +1,46 @@
+# import standard packages
+import os
+import pickle
+import hashlib
+
+
+def snapshot_key(excel, generation):
+    """Identity of the data a snapshot was taken from.
+
+    The workbook is identified by mtime, size and content hash, the local
+    store by its write generation.
+    """
+    if not os.path.exists(excel):
+        return (None, None, None, generation)
+    st = os.stat(excel)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(excel, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return (st.st_mtime_ns, st.st_size, digest.hexdigest(), generation)
+
+
+def load_snapshot(path, key):
+    """Return the cached frame, or None when missing or taken from other data"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            if pickle.load(f) != key:
+                return None
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Warning: Could not read database snapshot: {e}")
+        return None
+
+
+def save_snapshot(path, key, df):
+    # key goes first so that a stale snapshot is rejected without loading it
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"Warning: Could not write database snapshot: {e}")
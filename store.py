@@ -0,0 +1,214 @@
+# import standard packages
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+import pandas as pd
+
+
+def file_stamp(path):
+    """Cheap change marker for a file: mtime and size"""
+    st = os.stat(path)
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _sql_value(value):
+    # sqlite only understands plain python values, NaN/NA become NULL
+    if value is None or value is pd.NA:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class LockerStore:
+    """SQLite backed storage for the locker database.
+
+    Keeps a shadow copy of the last persisted frame so that sync() only
+    writes the rows which were added, changed or removed since then.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.shadow = None  # last persisted state of the frame
+        self.actor_shadow = None  # last persisted actor table
+        # autocommit mode, writes of several statements run in explicit
+        # transactions (see _transaction()) so that DROP/CREATE are part of
+        # them, the sqlite3 module would commit those on its own otherwise
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # caller holds the lock. Everything inside commits together or not
+        # at all, a crash in between leaves the previous state
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return default if row is None else row[0]
+
+    def set_meta(self, key, value):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, str(value)),
+            )
+
+    def generation(self):
+        """Counter which changes with every write to the movies table"""
+        return int(self.get_meta("generation", "0"))
+
+    def _bump_generation(self):
+        # caller holds the lock and runs a transaction
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', "
+            "COALESCE((SELECT value FROM meta WHERE key = 'generation'), 0) + 1)"
+        )
+
+    def columns(self):
+        """Data columns of the movies table, without the rel_path key"""
+        with self.lock:
+            info = self.conn.execute("PRAGMA table_info(movies)").fetchall()
+        return [row[1] for row in info if row[1] != "rel_path"]
+
+    def is_empty(self):
+        if len(self.columns()) == 0:
+            return True
+        with self.lock:
+            row = self.conn.execute("SELECT 1 FROM movies LIMIT 1").fetchone()
+        return row is None
+
+    def load(self):
+        """Read the whole movies table into a frame indexed by rel_path"""
+        with self.lock:
+            df = pd.read_sql_query(
+                "SELECT * FROM movies", self.conn, index_col="rel_path"
+            )
+        self.shadow = df.copy()
+        return df
+
+    def adopt(self, df):
+        """Take a frame loaded elsewhere (e.g. a snapshot) as persisted state"""
+        self.shadow = df.copy()
+
+    def replace_all(self, df):
+        """Rewrite the movies table from scratch, e.g. after a workbook import"""
+        df = df[~df.index.duplicated(keep="last")]
+        cols = df.columns.tolist()
+        coldefs = ", ".join(f'"{col}"' for col in cols)
+        with self.lock, self._transaction():
+            self.conn.execute("DROP TABLE IF EXISTS movies")
+            self.conn.execute(
+                f"CREATE TABLE movies (rel_path TEXT PRIMARY KEY, {coldefs})"
+            )
+            self._upsert(df, df.index)
+            self._bump_generation()
+        self.shadow = df.copy()
+
+    def sync(self, df):
+        """Persist only the rows that differ from the last persisted state.
+
+        Returns the number of rows written or deleted.
+        """
+        df = df[~df.index.duplicated(keep="last")]
+        old = self.shadow
+        if old is None or old.columns.tolist() != df.columns.tolist():
+            self.replace_all(df)
+            return len(df)
+
+        removed = old.index.difference(df.index)
+        added = df.index.difference(old.index)
+        common = df.index.intersection(old.index)
+
+        # compare as plain objects so that dtype changes do not matter
+        new_vals = df.loc[common].astype(object)
+        old_vals = old.loc[common].astype(object)
+        same = (new_vals == old_vals) | (new_vals.isna() & old_vals.isna())
+        changed = common[~same.all(axis=1).to_numpy()]
+
+        dirty = added.append(changed)
+        if len(dirty) + len(removed) == 0:
+            return 0
+
+        with self.lock, self._transaction():
+            self._upsert(df, dirty)
+            self.conn.executemany(
+                "DELETE FROM movies WHERE rel_path = ?",
+                [(rel_path,) for rel_path in removed],
+            )
+            self._bump_generation()
+        self.shadow = df.copy()
+        return len(dirty) + len(removed)
+
+    def load_actors(self):
+        """Read the actor table into a frame indexed by actor, None if missing"""
+        with self.lock:
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'actors'"
+            ).fetchone()
+            if exists is None:
+                return None
+            df = pd.read_sql_query("SELECT * FROM actors", self.conn, index_col="actor")
+        self.actor_shadow = df.copy()
+        return df
+
+    def sync_actors(self, df):
+        """Rewrite the actor table if it differs from the persisted one.
+
+        The table has one row per actor, small enough to write in full.
+        """
+        if self.actor_shadow is not None and (
+            self.actor_shadow.astype(object).equals(df.astype(object))
+        ):
+            return 0
+        cols = df.columns.tolist()
+        values = [df[col].tolist() for col in cols]
+        rows = [
+            tuple(_sql_value(v) for v in row) for row in zip(df.index.tolist(), *values)
+        ]
+        coldefs = ", ".join(f'"{col}"' for col in cols)
+        marks = ", ".join(["?"] * (len(cols) + 1))
+        with self.lock, self._transaction():
+            self.conn.execute("DROP TABLE IF EXISTS actors")
+            self.conn.execute(
+                f"CREATE TABLE actors (actor TEXT PRIMARY KEY, {coldefs})"
+            )
+            self.conn.executemany(f"INSERT INTO actors VALUES ({marks})", rows)
+        self.actor_shadow = df.copy()
+        return len(rows)
+
+    def _upsert(self, df, index):
+        # caller holds the lock and runs a transaction
+        if len(index) == 0:
+            return
+        cols = df.columns.tolist()
+        part = df.loc[index]
+        values = [part[col].tolist() for col in cols]
+        rows = [
+            tuple(_sql_value(v) for v in row)
+            for row in zip(part.index.tolist(), *values)
+        ]
+        collist = ", ".join(["rel_path"] + [f'"{col}"' for col in cols])
+        marks = ", ".join(["?"] * (len(cols) + 1))
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO movies ({collist}) VALUES ({marks})", rows
+        )
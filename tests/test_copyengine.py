@@ -0,0 +1,56 @@
+import errno
+import os
+import pytest
+import copyengine
+from copyengine import copy_file
+
+
+@pytest.fixture
+def src(tmp_path):
+    path = tmp_path / "src.mp4"
+    path.write_bytes(os.urandom(3 * 1024 * 1024 + 123))
+    return path
+
+
+def unsupported(*args):
+    raise OSError(errno.ENOSYS, "not here")
+
+
+def test_copy_matches_the_source(src, tmp_path):
+    dest = tmp_path / "dest.mp4"
+    assert copy_file(str(src), str(dest)) == src.stat().st_size
+    assert dest.read_bytes() == src.read_bytes()
+
+
+def test_copy_falls_back_to_read_write(src, tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+    monkeypatch.setattr(os, "sendfile", unsupported, raising=False)
+    dest = tmp_path / "dest.mp4"
+    copy_file(str(src), str(dest))
+    assert dest.read_bytes() == src.read_bytes()
+
+
+def test_fallback_carries_on_after_a_partial_copy(src, tmp_path, monkeypatch):
+    # the first method copies one chunk and then gives up
+    monkeypatch.setattr(copyengine, "CHUNK_SIZE", 1024 * 1024)
+    calls = []
+
+    def once(in_fd, out_fd, count):
+        if calls:
+            raise OSError(errno.EXDEV, "cross device")
+        calls.append(count)
+        data = os.read(in_fd, count)
+        return os.write(out_fd, data)
+
+    monkeypatch.setattr(os, "copy_file_range", once, raising=False)
+    monkeypatch.setattr(os, "sendfile", unsupported, raising=False)
+    dest = tmp_path / "dest.mp4"
+    copy_file(str(src), str(dest))
+    assert calls == [1024 * 1024]
+    assert dest.read_bytes() == src.read_bytes()
+
+
+def test_progress_adds_up_to_the_size(src, tmp_path):
+    seen = []
+    copy_file(str(src), str(tmp_path / "dest.mp4"), seen.append)
+    assert sum(seen) == src.stat().st_size
@@ -0,0 +1,66 @@
+import os
+import pytest
+from copyjob import CopyJob, part_path
+
+ITEMS = [("s\\a\\1.mp4", 10), ("s\\a\\2.mp4", 20), ("s\\b\\3.mp4", 30)]
+
+
+def dest_path(root, rel_path):
+    return os.path.join(str(root), *rel_path.split("\\"))
+
+
+def test_load_after_a_partial_run_returns_the_pending_items(tmp_path):
+    job = CopyJob(str(tmp_path), "random", ITEMS)
+    job.save()
+    job.mark_done(ITEMS[1][0])
+    job.close()
+
+    loaded = CopyJob.load(str(tmp_path))
+    assert loaded.kind == "random"
+    assert loaded.pending() == [ITEMS[0], ITEMS[2]]
+    assert loaded.total_size() == 60
+
+
+def test_completions_after_a_torn_line_survive(tmp_path):
+    job = CopyJob(str(tmp_path), "random", ITEMS)
+    job.save()
+    job.mark_done(ITEMS[0][0])
+    job.close()
+    with open(job.done_path, "a", encoding="utf-8") as f:
+        f.write('"s\\\\a')
+
+    job = CopyJob.load(str(tmp_path))
+    job.mark_done(ITEMS[2][0])
+    job.close()
+    assert CopyJob.load(str(tmp_path)).pending() == [ITEMS[1]]
+
+
+def test_finish_removes_the_manifest_and_partial_files(tmp_path):
+    job = CopyJob(str(tmp_path), "random", ITEMS)
+    job.save()
+    part = part_path(dest_path(tmp_path, ITEMS[0][0]))
+    os.makedirs(os.path.dirname(part))
+    with open(part, "wb") as f:
+        f.write(b"half")
+
+    job.finish()
+    assert not os.path.exists(part)
+    assert CopyJob.load(str(tmp_path)) is None
+
+
+def test_failed_copy_leaves_no_partial_file(tmp_path):
+    main = pytest.importorskip("main")
+    src_root = tmp_path / "movies"
+    os.makedirs(src_root / "s" / "a")
+    (src_root / "s" / "a" / "1.mp4").write_bytes(b"x" * 1000)
+    config = {"DEFAULT": {"MOVIEDIR": str(src_root)}}
+
+    def interrupted(n):
+        raise OSError("device removed")
+
+    dest_root = tmp_path / "dest"
+    result = main.copy_single_movie(ITEMS[0], config, str(dest_root), None, interrupted)
+    assert result[2] is False
+    final = dest_path(dest_root, ITEMS[0][0])
+    assert not os.path.exists(part_path(final))
+    assert not os.path.exists(final)
@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+from journal import Journal, replay
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = Journal(str(tmp_path / "locker.journal"))
+    yield journal
+    journal.close()
+
+
+def frame():
+    df = pd.DataFrame(
+        {"playcount": [0, 1], "actor": ["x", "y"], "studio": ["s", "s"]},
+        index=pd.Index(["a", "b"], name="rel_path"),
+    )
+    return df
+
+
+def test_replay_applies_records_in_order():
+    records = [
+        {"op": "set", "rel_path": "a", "col": "playcount", "value": 3},
+        {"op": "set_actor", "actor": "y", "col": "studio", "value": "t"},
+        {"op": "add", "rel_path": "c", "row": {"playcount": 0, "actor": "x"}},
+        {"op": "del", "rel_path": "b"},
+        {"op": "set", "rel_path": "gone", "col": "playcount", "value": 1},
+    ]
+    df = replay(frame(), records)
+    assert df.index.tolist() == ["a", "c"]
+    assert df.at["a", "playcount"] == 3
+    assert df.index.name == "rel_path"
+
+
+def test_replay_adds_new_categories():
+    df = frame().astype({"studio": "category"})
+    records = [{"op": "set", "rel_path": "a", "col": "studio", "value": "new"}]
+    assert replay(df, records).at["a", "studio"] == "new"
+
+
+def test_rotation_keeps_records_until_discarded(journal):
+    journal.append({"op": "del", "rel_path": "a"})
+    rotation = journal.rotate()
+    journal.append({"op": "del", "rel_path": "b"})
+    assert [r["rel_path"] for r in journal.records()] == ["a", "b"]
+    assert journal.count == 1
+
+    journal.discard_rotated(rotation)
+    assert [r["rel_path"] for r in journal.records()] == ["b"]
+
+
+def test_discard_of_an_older_rotation_keeps_newer_records(journal):
+    journal.append({"op": "del", "rel_path": "a"})
+    first = journal.rotate()
+    journal.append({"op": "del", "rel_path": "b"})
+    journal.rotate()
+    # the write of the first rotation finishes after the second rotation
+    journal.discard_rotated(first)
+    assert [r["rel_path"] for r in journal.records()] == ["a", "b"]
+
+
+def test_torn_last_line_is_ignored(journal):
+    journal.append({"op": "del", "rel_path": "a"})
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"op": "del", "rel_pa')
+    assert [r["rel_path"] for r in journal.records()] == ["a"]
+
+
+def test_records_after_a_torn_line_survive(tmp_path):
+    path = str(tmp_path / "locker.journal")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"op": "del", "rel_path": "a"}\n{"op": "del", "rel_pa')
+    journal = Journal(path)
+    journal.append({"op": "del", "rel_path": "b"}, {"op": "del", "rel_path": "c"})
+    journal.close()
+
+    journal = Journal(path)
+    assert [r["rel_path"] for r in journal.records()] == ["a", "b", "c"]
+    journal.close()
+
+
+def test_replay_batches_keep_the_record_order():
+    records = [
+        {"op": "add", "rel_path": "c", "row": {"playcount": 0, "actor": "x"}},
+        {"op": "add", "rel_path": "c", "row": {"playcount": 9, "actor": "x"}},
+        {"op": "set", "rel_path": "c", "col": "playcount", "value": 2},
+        {"op": "del", "rel_path": "c"},
+        {"op": "del", "rel_path": "a"},
+        {"op": "add", "rel_path": "a", "row": {"playcount": 5, "actor": "z"}},
+    ]
+    df = replay(frame(), records)
+    assert df.index.tolist() == ["b", "a"]
+    assert df.at["a", "playcount"] == 5
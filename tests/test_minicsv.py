@@ -0,0 +1,54 @@
+import csv
+from minicsv import MiniCsvWriter, ACTOR_STATS_COLUMNS
+
+# the layout play_rpi.sh cuts the fields out of
+MOVIE_COLUMNS = ["rel_path", "playcount", "movie_rating", "actor", "category", "studio"]
+
+
+def read(path):
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_appends_follow_the_existing_header(tmp_path):
+    movies = tmp_path / "LockerDB_mini.csv"
+    stats = tmp_path / "actor_stats.csv"
+    movies.write_text(
+        ",".join(MOVIE_COLUMNS) + "\ns/a/1.mp4,2,4,a,c,s\n", encoding="utf-8"
+    )
+    stats.write_text(",".join(ACTOR_STATS_COLUMNS) + "\na,3,\n", encoding="utf-8")
+
+    # the caller's column order differs, the file's header wins
+    writer = MiniCsvWriter(
+        str(movies), list(reversed(MOVIE_COLUMNS)), str(stats), ["a"]
+    )
+    row = {
+        "rel_path": "s/b/2.mp4",
+        "playcount": 0,
+        "movie_rating": 5,
+        "actor": "b",
+        "category": float("nan"),
+        "studio": "s",
+    }
+    writer.add(row, "b", 1)
+    writer.add(dict(row, rel_path="s/a/3.mp4", actor="a"), "a", 3)
+    writer.close()
+
+    assert read(movies) == [
+        MOVIE_COLUMNS,
+        ["s/a/1.mp4", "2", "4", "a", "c", "s"],
+        ["s/b/2.mp4", "0", "5", "b", "", "s"],
+        ["s/a/3.mp4", "0", "5", "a", "", "s"],
+    ]
+    assert read(stats) == [ACTOR_STATS_COLUMNS, ["a", "3", ""], ["b", "1", ""]]
+
+
+def test_new_files_get_a_header(tmp_path):
+    movies = tmp_path / "LockerDB_mini.csv"
+    stats = tmp_path / "actor_stats.csv"
+    writer = MiniCsvWriter(str(movies), MOVIE_COLUMNS, str(stats), [])
+    writer.add(dict(zip(MOVIE_COLUMNS, ["s/a/1.mp4", 1, 2, "a", "c", "s"])), "a", 0)
+    writer.close()
+
+    assert read(movies) == [MOVIE_COLUMNS, ["s/a/1.mp4", "1", "2", "a", "c", "s"]]
+    assert read(stats) == [ACTOR_STATS_COLUMNS, ["a", "0", ""]]
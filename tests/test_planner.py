@@ -0,0 +1,41 @@
+import numpy as np
+from planner import plan_fill, weighted_order
+
+
+def test_plan_fill_skips_items_which_do_not_fit():
+    sizes = [60, 50, 30, 10]
+    chosen = plan_fill(sizes, 100)
+    # a plain cumulative cut would stop after 60
+    assert sorted(chosen.tolist()) == [0, 2, 3]
+
+
+def test_plan_fill_swaps_to_close_the_gap():
+    sizes = [50, 40, 45]
+    chosen = plan_fill(sizes, 95, order=[0, 1, 2])
+    assert sum(sizes[i] for i in chosen) == 95
+
+
+def test_plan_fill_never_exceeds_capacity():
+    rng = np.random.default_rng(1)
+    sizes = rng.integers(1, 1000, 500)
+    for capacity in [0, 1, 999, 5000, 100000, int(sizes.sum())]:
+        chosen = plan_fill(sizes, capacity, order=rng.permutation(len(sizes)))
+        assert sizes[chosen].sum() <= capacity
+        assert len(set(chosen.tolist())) == len(chosen)
+
+
+def test_plan_fill_takes_everything_that_fits():
+    sizes = [1, 2, 3]
+    assert sorted(plan_fill(sizes, 10).tolist()) == [0, 1, 2]
+
+
+def test_weighted_order_is_a_permutation():
+    order = weighted_order(np.ones(100), np.random.default_rng(0))
+    assert sorted(order.tolist()) == list(range(100))
+
+
+def test_weighted_order_prefers_heavy_items():
+    rng = np.random.default_rng(0)
+    weights = np.array([100.0] + [1.0] * 9)
+    firsts = [weighted_order(weights, rng)[0] for _ in range(200)]
+    assert firsts.count(0) > 150
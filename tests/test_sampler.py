@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sampler import Sampler, parse_weights
+
+
+def frame(n):
+    return pd.DataFrame(
+        {
+            "actor": [f"actor{i % 4}" for i in range(n)],
+            "movie_rating": np.arange(n) % 6,
+            "playcount": np.zeros(n, dtype=int),
+        },
+        index=[f"movie{i}" for i in range(n)],
+    )
+
+
+def test_no_repeat_until_the_pool_is_exhausted():
+    df = frame(50)
+    sampler = Sampler(parse_weights("movie_rating=2"), rng=np.random.default_rng(0))
+    positions = np.arange(50)
+    first = [sampler.pick_movie(df, "all", positions) for _ in range(50)]
+    assert sorted(first) == list(range(50))
+    second = [sampler.pick_movie(df, "all", positions) for _ in range(50)]
+    assert sorted(second) == list(range(50))
+
+
+def test_modes_have_their_own_bags():
+    df = frame(10)
+    sampler = Sampler(rng=np.random.default_rng(0))
+    a = [sampler.pick_movie(df, "a", np.arange(10)) for _ in range(10)]
+    b = [sampler.pick_movie(df, "b", np.arange(10)) for _ in range(10)]
+    assert sorted(a) == sorted(b) == list(range(10))
+
+
+def test_changed_pool_keeps_drawn_items_out():
+    df = frame(20)
+    sampler = Sampler(rng=np.random.default_rng(0))
+    drawn = [sampler.pick_movie(df, "m", np.arange(10)) for _ in range(5)]
+    rest = [sampler.pick_movie(df, "m", np.arange(12)) for _ in range(7)]
+    assert sorted(drawn + rest) == list(range(12))
+
+
+def test_actor_picks_do_not_repeat():
+    df = frame(40)
+    sampler = Sampler(rng=np.random.default_rng(0))
+    actors = [sampler.pick_actor(df, "actors", np.arange(40)) for _ in range(4)]
+    assert sorted(actors) == ["actor0", "actor1", "actor2", "actor3"]
+
+
+def test_empty_pool_gives_none():
+    sampler = Sampler()
+    assert sampler.pick_movie(frame(3), "m", np.arange(0)) is None
+
+
+def test_parse_weights_rejects_unknown_factors():
+    assert parse_weights("")["movie_rating"] == 0
+    assert parse_weights("playcount=0.5")["playcount"] == 0.5
+    with pytest.raises(ValueError):
+        parse_weights("bogus=1")
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from schema import compact, allow_value
+
+
+def frame():
+    df = pd.DataFrame(
+        {"actor": ["x", "y"], "movie_rating": [3, 0], "playcount": [1, 2]},
+        index=["a", "b"],
+    )
+    return compact(df)
+
+
+def test_new_category_is_added():
+    df = frame()
+    allow_value(df, "actor", "z")
+    df.at["a", "actor"] = "z"
+    assert df.at["a", "actor"] == "z"
+
+
+def test_value_in_range_keeps_the_compact_dtype():
+    df = frame()
+    allow_value(df, "movie_rating", 127)
+    df.at["a", "movie_rating"] = 127
+    assert df["movie_rating"].dtype == np.int8
+
+
+def test_value_out_of_range_widens_the_column():
+    df = frame()
+    allow_value(df, "movie_rating", 300)
+    df.at["a", "movie_rating"] = 300
+    assert df.at["a", "movie_rating"] == 300
+    assert df.at["b", "movie_rating"] == 0
+
+
+def test_fractional_value_widens_the_column():
+    df = frame()
+    allow_value(df, "playcount", 2.5)
+    df.at["b", "playcount"] = 2.5
+    assert df.at["b", "playcount"] == 2.5
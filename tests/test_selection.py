@@ -0,0 +1,50 @@
+import pandas as pd
+from selection import SelectionIndex
+
+
+def frame():
+    return pd.DataFrame(
+        {
+            "actor": ["x", "y", "x", "z"],
+            "studio": ["s", "s", "t", None],
+            "category": ["c", "c", "c", "c"],
+            "movie_rating": [0, 5, 5, 3],
+            "playcount": [0, 2, 0, 1],
+        },
+        index=["a", "b", "c", "d"],
+    )
+
+
+def test_positions_per_dimension():
+    df = frame()
+    selection = SelectionIndex()
+    assert selection.positions(df, "actor", "x").tolist() == [0, 2]
+    assert selection.positions(df, "played", False).tolist() == [0, 2]
+    assert sorted(selection.keys(df, "studio")) == ["s", "t"]
+    assert selection.positions(df, "studio", None).tolist() == [3]
+    rated = selection.positions_where(df, "movie_rating", lambda r: r >= 4)
+    assert sorted(rated.tolist()) == [1, 2]
+
+
+def test_update_moves_rows_between_buckets():
+    df = frame()
+    selection = SelectionIndex()
+    selection.positions(df, "movie_rating", 0)
+
+    df.at["a", "movie_rating"] = 5
+    selection.update(df, [0], "movie_rating", [0], 5)
+    assert selection.positions(df, "movie_rating", 0).tolist() == []
+    assert sorted(selection.positions(df, "movie_rating", 5).tolist()) == [0, 1, 2]
+    assert 0 not in selection.keys(df, "movie_rating")
+
+    df.at["a", "playcount"] = 1
+    selection.update(df, [0], "playcount", [0], 1)
+    assert selection.positions(df, "played", False).tolist() == [2]
+
+
+def test_new_frame_rebuilds_the_index():
+    df = frame()
+    selection = SelectionIndex()
+    assert selection.positions(df, "actor", "x").tolist() == [0, 2]
+    df = df.drop("a")
+    assert selection.positions(df, "actor", "x").tolist() == [1]
@@ -0,0 +1,67 @@
+import sqlite3
+import pandas as pd
+import pytest
+from store import LockerStore
+
+
+def frame(rows):
+    df = pd.DataFrame(rows, columns=["rel_path", "playcount", "actor"])
+    return df.set_index("rel_path")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LockerStore(str(tmp_path / "locker.db"))
+    yield store
+    store.close()
+
+
+def test_sync_writes_only_changed_rows(store):
+    store.replace_all(frame([("a", 0, "x"), ("b", 1, "y"), ("c", 2, "z")]))
+    generation = store.generation()
+
+    df = frame([("a", 0, "x"), ("b", 5, "y"), ("d", 0, "w")])
+    # b changed, d added, c removed
+    assert store.sync(df) == 3
+    assert store.generation() == generation + 1
+    loaded = store.load()
+    assert sorted(loaded.index) == ["a", "b", "d"]
+    assert loaded.at["b", "playcount"] == 5
+
+
+def test_sync_without_changes_writes_nothing(store):
+    df = frame([("a", 0, "x"), ("b", 1, "y")])
+    store.replace_all(df)
+    generation = store.generation()
+    assert store.sync(df.copy()) == 0
+    assert store.generation() == generation
+
+
+def test_sync_ignores_dtype_changes(store):
+    df = frame([("a", 0, "x"), ("b", 1, None)])
+    store.replace_all(df)
+    compact = df.astype({"playcount": "int8", "actor": "category"})
+    assert store.sync(compact) == 0
+
+
+def test_replace_all_rolls_back_on_error(store):
+    store.replace_all(frame([("a", 0, "x"), ("b", 1, "y")]))
+
+    def fail():
+        raise RuntimeError("crash")
+
+    store._bump_generation = fail
+    with pytest.raises(RuntimeError):
+        store.replace_all(frame([("c", 0, "z")]))
+    assert sorted(store.load().index) == ["a", "b"]
+
+
+def test_sync_actors_rolls_back_on_error(store):
+    actors = pd.DataFrame({"actor_rating": [3, 0]}, index=["x", "y"])
+    store.sync_actors(actors)
+
+    # a duplicate actor fails the insert after the table was dropped
+    broken = pd.DataFrame({"actor_rating": [1, 2]}, index=["z", "z"])
+    with pytest.raises(sqlite3.IntegrityError):
+        store.sync_actors(broken)
+    assert store.load_actors()["actor_rating"].to_dict() == {"x": 3, "y": 0}
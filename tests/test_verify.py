@@ -0,0 +1,22 @@
+from verify import DigestLog, file_digest
+
+
+def test_digests_after_a_torn_line_survive(tmp_path):
+    log = DigestLog(str(tmp_path))
+    log.append("a", 1, "x")
+    log.close()
+    with open(log.path, "a", encoding="utf-8") as f:
+        f.write('{"rel_path": "b", "si')
+
+    log = DigestLog(str(tmp_path))
+    log.append("c", 3, "z")
+    log.close()
+    assert DigestLog(str(tmp_path)).load() == {"a": (1, "x"), "c": (3, "z")}
+
+
+def test_equal_files_have_equal_digests(tmp_path):
+    (tmp_path / "a").write_bytes(b"movie" * 1000)
+    (tmp_path / "b").write_bytes(b"movie" * 1000)
+    (tmp_path / "c").write_bytes(b"movie" * 999)
+    a, b, c = (file_digest(str(tmp_path / name)) for name in "abc")
+    assert a == b != c
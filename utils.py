@@ -1,4 +1,5 @@
 import os
+import time
 # import easygui
 
 
@@ -28,3 +29,53 @@ def myprint(msg, target="console"):
     elif target == "gui":
         # easygui.msgbox(msg)
         pass
+
+
+def drop_torn_line(path):
+    """Cut a partial last line, left by a crash, off an append-only file.
+
+    Lines appended after it would not be readable anymore. Returns True
+    when something was cut.
+    """
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return False
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        # search the last newline from the end, the rest is short
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            pos = f.read(end - start).rfind(b"\n")
+            if pos >= 0:
+                end = start + pos + 1
+                break
+            end = start
+        if end == size:
+            return False
+        f.truncate(end)
+        f.flush()
+        os.fsync(f.fileno())
+    return True
+
+
+class StageTimer:
+    """Measures consecutive stages, e.g. import, load and stats at startup"""
+
+    def __init__(self, start=None):
+        self.last = time.perf_counter() if start is None else start
+        self.stages = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.stages.append((name, now - self.last))
+        self.last = now
+
+    def total(self):
+        return sum(duration for _, duration in self.stages)
+
+    def report(self):
+        parts = [f"{name} {duration:.2f} s" for name, duration in self.stages]
+        return ", ".join(parts) + f" (total {self.total():.2f} s)"
@@ -0,0 +1,119 @@
+# import standard packages
+import os
+import json
+import hashlib
+import threading
+from utils import drop_torn_line
+
+DIGEST_FILENAME = ".lockerplayer_digests"
+CHUNK_SIZE = 8 * 1024 * 1024
+DIGEST_SIZE = 32
+
+
+def file_digest(path, drop_cache=False):
+    """blake2b of a file, read in fixed-size chunks.
+
+    With drop_cache the file is synced and dropped from the page cache
+    first, so the bytes come from the device and not from memory.
+    """
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    buf = bytearray(CHUNK_SIZE)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        if drop_cache and hasattr(os, "posix_fadvise"):
+            os.fsync(f.fileno())
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        elif hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.hexdigest()
+
+
+class DigestLog:
+    """Digests of the verified files at a destination, one JSON line each.
+
+    Lives next to the copied movies and is kept across copy runs, later
+    re-verification only needs to read the destination files.
+    """
+
+    def __init__(self, destroot):
+        self.path = os.path.join(destroot, DIGEST_FILENAME)
+        self.lock = threading.Lock()
+        self.f = None
+
+    def load(self):
+        """rel_path -> (size, digest), the newest record wins"""
+        digests = {}
+        if not os.path.exists(self.path):
+            return digests
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # torn last line after a crash
+                    break
+                digests[record["rel_path"]] = (record["size"], record["blake2b"])
+        return digests
+
+    def append(self, rel_path, size, digest):
+        record = {"rel_path": rel_path, "size": size, "blake2b": digest}
+        with self.lock:
+            if self.f is None:
+                # a torn line of a crashed run would hide the lines after it
+                drop_torn_line(self.path)
+                self.f = open(self.path, "a", encoding="utf-8")
+            self.f.write(json.dumps(record) + "\n")
+            self.f.flush()
+            os.fsync(self.f.fileno())
+
+    def drop(self, rel_paths):
+        """Forget the digests of files removed from the destination"""
+        rel_paths = set(rel_paths)
+        digests = self.load()
+        if len(rel_paths.intersection(digests)) == 0:
+            return
+        with self.lock:
+            if self.f is not None:
+                self.f.close()
+                self.f = None
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for rel_path, (size, digest) in digests.items():
+                    if rel_path not in rel_paths:
+                        record = {"rel_path": rel_path, "size": size, "blake2b": digest}
+                        f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def close(self):
+        with self.lock:
+            if self.f is not None:
+                self.f.close()
+                self.f = None
+
+
+def verify_copy(src, dest):
+    """Hash source and destination, returns (digest, error message or None)"""
+    src_digest = file_digest(src)
+    dest_digest = file_digest(dest, drop_cache=True)
+    if src_digest != dest_digest:
+        return src_digest, "checksum mismatch"
+    return src_digest, None
+
+
+def verify_file(path, size, digest):
+    """Re-check a file at the destination against its recorded digest"""
+    try:
+        if os.path.getsize(path) != size:
+            return "size mismatch"
+        if file_digest(path, drop_cache=True) != digest:
+            return "checksum mismatch"
+    except FileNotFoundError:
+        return "missing"
+    return None
@@ -0,0 +1,226 @@
+# import standard packages
+import os
+import time
+import errno
+import select
+import struct
+import threading
+from scanner import to_db_path
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class _Inotify:
+    """Minimal ctypes binding for the Linux inotify API"""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.get_errno = ctypes.get_errno
+
+    def add_watch(self, path, mask):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(self.get_errno(), f"inotify_add_watch failed: {path}")
+        return wd
+
+    def rm_watch(self, wd):
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout):
+        """Yield (wd, mask, name) events, waiting at most timeout seconds"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if len(ready) == 0:
+            return
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            yield wd, mask, os.fsdecode(name)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Watcher(threading.Thread):
+    """Keeps an eye on the movie folder and reports changes in batches.
+
+    Uses inotify on Linux and falls back to polling list_func() every
+    poll_interval seconds elsewhere, or when inotify is not available.
+    list_func() returns None when the folder could not be read
+    completely, that round is skipped instead of reporting removals.
+    Changes are debounced: on_changes(added, removed, removed_dirs, resync)
+    is called once no event came in for `debounce` seconds, or at the
+    latest after `max_delay` seconds of continuous events (e.g. a large
+    copy). All paths are database keys. resync asks for a full rescan,
+    after the kernel event queue overflowed.
+    """
+
+    def __init__(
+        self,
+        root,
+        on_changes,
+        list_func,
+        debounce=2.0,
+        max_delay=30.0,
+        poll_interval=30.0,
+    ):
+        super().__init__(name="movie-watcher", daemon=True)
+        self.root = root
+        self.on_changes = on_changes
+        self.list_func = list_func
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+        self.inotify = None
+        self.wd_paths = {}  # watch descriptor -> folder
+        self.pending = {}  # rel_path -> True when added, False when removed
+        self.removed_dirs = set()
+        self.resync = False
+        self.mode = "polling"
+        try:
+            self.inotify = _Inotify()
+            self.mode = "inotify"
+        except (OSError, AttributeError, TypeError) as e:
+            print(f"Warning: inotify not available, polling the movie folder: {e}")
+
+    def stop(self):
+        self.stopping.set()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        try:
+            if self.inotify is not None:
+                self._run_inotify()
+            else:
+                self._run_polling()
+        except Exception as e:
+            print(f"ERROR: Movie folder watch stopped: {e}")
+
+    def _rel_path(self, path):
+        return to_db_path(os.path.relpath(path, self.root))
+
+    def _flush(self):
+        added = [path for path, is_added in self.pending.items() if is_added]
+        removed = [path for path, is_added in self.pending.items() if not is_added]
+        removed_dirs = list(self.removed_dirs)
+        resync = self.resync
+        self.pending = {}
+        self.removed_dirs = set()
+        self.resync = False
+        if len(added) + len(removed) + len(removed_dirs) > 0 or resync:
+            self.on_changes(added, removed, removed_dirs, resync)
+
+    # polling fallback
+
+    def _run_polling(self):
+        known = self.list_func()
+        while not self.stopping.wait(self.poll_interval):
+            current = self.list_func()
+            if current is None:
+                continue
+            current = set(current)
+            if known is not None:
+                for rel_path in current - set(known):
+                    self.pending[rel_path] = True
+                for rel_path in set(known) - current:
+                    self.pending[rel_path] = False
+            known = current
+            self._flush()
+
+    # inotify
+
+    def _watch_tree(self, top, report_files):
+        # watch a folder and everything below it. Files already inside a
+        # folder that just appeared are reported, they were copied in
+        # before the watch existed
+        for folder, _, files in os.walk(top):
+            try:
+                wd = self.inotify.add_watch(folder, WATCH_MASK)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    print("Warning: Out of inotify watches, raise max_user_watches")
+                continue
+            self.wd_paths[wd] = folder
+            if report_files:
+                for file in files:
+                    rel_path = self._rel_path(os.path.join(folder, file))
+                    self.pending[rel_path] = True
+
+    def _unwatch_tree(self, top):
+        prefix = top + os.sep
+        for wd, folder in list(self.wd_paths.items()):
+            if folder == top or folder.startswith(prefix):
+                self.inotify.rm_watch(wd)
+                del self.wd_paths[wd]
+
+    def _handle(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            self.resync = True
+            return
+        if mask & IN_IGNORED:
+            self.wd_paths.pop(wd, None)
+            return
+        folder = self.wd_paths.get(wd)
+        if folder is None or name == "":
+            return
+        path = os.path.join(folder, name)
+
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(path, True)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._unwatch_tree(path)
+                self.removed_dirs.add(self._rel_path(path))
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self.pending[self._rel_path(path)] = True
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self.pending[self._rel_path(path)] = False
+
+    def _run_inotify(self):
+        self._watch_tree(self.root, False)
+        first_event = None
+        last_event = None
+        try:
+            while not self.stopping.is_set():
+                got_event = False
+                for wd, mask, name in self.inotify.read_events(0.5):
+                    self._handle(wd, mask, name)
+                    got_event = True
+                now = time.monotonic()
+                if got_event:
+                    last_event = now
+                    if first_event is None:
+                        first_event = now
+                if first_event is not None and (
+                    now - last_event >= self.debounce
+                    or now - first_event >= self.max_delay
+                ):
+                    first_event = None
+                    self._flush()
+        finally:
+            self.inotify.close()
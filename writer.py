@@ -0,0 +1,78 @@
+# import standard packages
+import time
+import threading
+
+
+class PersistenceWriter(threading.Thread):
+    """Background thread which persists snapshots of the database.
+
+    submit() hands over a consistent copy of the frame and returns at once.
+    Requests which pile up while a write is running are coalesced, only
+    the newest one gets written.
+    """
+
+    def __init__(self, write_func):
+        super().__init__(name="persistence-writer", daemon=True)
+        self.write_func = write_func
+        self.cond = threading.Condition()
+        self.pending = None  # arguments of the newest unwritten request
+        self.depth = 0  # requests submitted but not yet persisted
+        self.busy = False
+        self.stopping = False
+        self.writes = 0
+        self.last_duration = None  # seconds taken by the last write
+        self.last_error = None
+
+    @property
+    def queue_depth(self):
+        with self.cond:
+            return self.depth
+
+    def submit(self, *args):
+        with self.cond:
+            self.pending = args
+            self.depth += 1
+            self.cond.notify_all()
+
+    def run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.pending is not None or self.stopping)
+                if self.pending is None:
+                    return
+                args, self.pending = self.pending, None
+                covered = self.depth
+                self.busy = True
+
+            start = time.perf_counter()
+            try:
+                self.write_func(*args)
+                self.last_error = None
+            except Exception as e:
+                # the journal still holds the changes, next write retries
+                self.last_error = e
+                print(f"ERROR: Background database write failed: {e}")
+            duration = time.perf_counter() - start
+
+            with self.cond:
+                self.depth -= covered
+                self.busy = False
+                self.writes += 1
+                self.last_duration = duration
+                self.cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Block until every submitted request is persisted"""
+        with self.cond:
+            return self.cond.wait_for(
+                lambda: self.pending is None and not self.busy, timeout
+            )
+
+    def stop(self):
+        """Flush pending writes and end the thread"""
+        self.flush()
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        if self.is_alive():
+            self.join()